@@ -1,5 +1,5 @@
 from down_sampling_method import DownSamplingMethod
-from typing import List
+from typing import List, Tuple, Union
 
 
 class Figure:
@@ -16,7 +16,9 @@ class Figure:
                  gradient_threshold: float,
                  down_sampling_method: DownSamplingMethod,
                  include_in_case: List[int],
-                 exclude_in_case: List[int]) -> None:
+                 exclude_in_case: List[int],
+                 gradient_decimation: int = 20,
+                 point_budget: Union[int, str] = 0) -> None:
         self.id = id
         self.title = title
         self.units = units
@@ -29,4 +31,12 @@ class Figure:
         self.gradient_threshold = float(gradient_threshold)
         self.down_sampling_method = down_sampling_method
         self.include_in_case: List[int] = include_in_case
-        self.exclude_in_case: List[int] = exclude_in_case
\ No newline at end of file
+        self.exclude_in_case: List[int] = exclude_in_case
+        self.gradient_decimation = int(gradient_decimation)
+        self.point_budget: Union[int, str] = 'auto' if str(point_budget).strip().lower() == 'auto' else int(point_budget)
+
+    def sampling(self, pixel_width: int) -> Tuple:
+        '''
+        Returns the downsampling settings of the figure for the given plot width in pixels, i.e. the arguments of sampling_functions.downSample after the signal.
+        '''
+        return (self.down_sampling_method, self.gradient_threshold, self.gradient_decimation, self.point_budget, pixel_width)
\ No newline at end of file
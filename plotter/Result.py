@@ -7,6 +7,7 @@ class ResultType(Enum):
     EMT_PSOUT = 2 #PSCAD .psout
     EMT_CSV   = 3 #PSCAD .psout -> .csv support
     EMT_ZIP   = 4 #PSCAD .psout -> .zip, .gz, .bz2 and .xz support
+    EMT_COLUMNAR = 5 #PSCAD .psout -> .parquet, .feather and .npz support
 
 
 class Result:
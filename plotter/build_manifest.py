@@ -0,0 +1,127 @@
+'''
+Build manifest of the plotter, used to only re-plot the ranks whose inputs or configuration changed since the previous run.
+The manifest.json in the results folder stores the fingerprint of each plotted rank, i.e. a hash of the content of the result files,
+the figure and cursor setup of the rank, the case and settings sheet values, the configuration, the rank list (navbar) and the plotter version.
+The content hashes of the result files are cached in the manifest by file size and modification time, so unchanged files are not read again.
+The manifest is written after each plotted rank, i.e. an interrupted run keeps the ranks plotted so far.
+'''
+from __future__ import annotations
+import hashlib
+import json
+from os import replace, stat
+from os.path import abspath, exists, join
+from typing import Dict, List
+from Result import Result
+from Figure import Figure
+from Cursor import Cursor
+from read_configs import ReadConfig
+from result_cache import resultSourceFiles
+
+MANIFEST_FILE = 'manifest.json'
+HASH_BLOCK_SIZE = 1 << 20
+IGNORED_SETTINGS = ('processes', 'resultCache', 'cacheFormat', 'streaming', 'scanIndex', 'incremental')   # Configuration settings that do not change the generated files
+
+
+def readManifest(resultsDir: str, version: str) -> Dict:
+    '''
+    Reads the build manifest of the results folder. The plotted ranks are dropped if the manifest is missing, invalid or was written
+    by another plotter version, while the cached file hashes are kept.
+    '''
+    manifest: Dict = {'version': version, 'files': dict(), 'ranks': dict()}
+    manifestPath = join(resultsDir, MANIFEST_FILE)
+    if not exists(manifestPath):
+        return manifest
+    try:
+        with open(manifestPath, 'r', encoding='utf-8') as file:
+            previous = json.load(file)
+    except (OSError, ValueError):
+        print(f'Ignoring invalid build manifest: {manifestPath}')
+        return manifest
+    manifest['files'] = previous.get('files', dict())
+    if previous.get('version') == version:
+        manifest['ranks'] = previous.get('ranks', dict())
+    return manifest
+
+
+def writeManifest(resultsDir: str, manifest: Dict) -> None:
+    manifestPath = join(resultsDir, MANIFEST_FILE)
+    with open(manifestPath + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=1)
+    replace(manifestPath + '.tmp', manifestPath)                                                                                    # An interrupted write does not corrupt the manifest
+
+
+def markRankPlotted(resultsDir: str, manifest: Dict, rank: int, fingerprint: str) -> None:
+    '''
+    Stores the fingerprint of the plotted rank and writes the manifest.
+    '''
+    manifest['ranks'][str(rank)] = fingerprint
+    writeManifest(resultsDir, manifest)
+
+
+def fileHash(filePath: str, manifest: Dict) -> str:
+    '''
+    Returns the content hash of the file. The hash is cached in the manifest by the file size and modification time.
+    '''
+    filePath = abspath(filePath)
+    fileStat = stat(filePath)
+    cached = manifest['files'].get(filePath)
+    if cached is not None and cached[0] == fileStat.st_size and cached[1] == fileStat.st_mtime_ns:
+        return cached[2]
+
+    digest = hashlib.sha1()
+    with open(filePath, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    manifest['files'][filePath] = [fileStat.st_size, fileStat.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def rankFingerprint(manifest: Dict,
+                    resultList: List[Result],
+                    figureList: List[Figure],
+                    ranksCursor: List[Cursor],
+                    caseDf, # Pandas DataFrame
+                    settingsDict: Dict[str, str],
+                    colorMap: Dict[str, List[str]],
+                    rankList: List[int],
+                    rankNameDict: Dict[int, str],
+                    config: ReadConfig) -> str:
+    '''
+    Returns the fingerprint of all the inputs of the plots of a rank. The plotted ranks and their names are included, as all the html pages
+    hold the navbar of the plotted ranks, i.e. all the ranks become stale when a rank is added or removed.
+    '''
+    inputs = {'version': manifest['version'],
+              'results': [[vars(result), [fileHash(file, manifest) for file in resultSourceFiles(result)]] for result in resultList],
+              'figures': [vars(figure) for figure in figureList],
+              'cursors': [vars(cursor) for cursor in ranksCursor],
+              'case': caseDf.to_csv(index=False),
+              'settings': {str(name): value for name, value in settingsDict.items()},
+              'colors': colorMap,
+              'ranks': [[rank, rankNameDict.get(rank)] for rank in rankList],
+              'config': {setting: value for setting, value in vars(config).items() if setting not in IGNORED_SETTINGS}}
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+
+
+def rankOutputs(rank: int, hasCursors: bool, config: ReadConfig) -> List[str]:
+    '''
+    Returns the files generated for the rank.
+    '''
+    outputs = list()
+    if config.genHTML:
+        outputs.append(f'{rank}.html')
+        if config.zoomPyramid:
+            outputs.append(f'{rank}_pyramid')
+    if config.genImage:
+        outputs.append(f'{rank}.{config.imageFormat}')
+    if config.genCursorPDF and hasCursors:
+        outputs.append(f'{rank}_cursor.pdf')
+    return outputs
+
+
+def isRankStale(manifest: Dict, rank: int, fingerprint: str, outputs: List[str], resultsDir: str) -> bool:
+    '''
+    Returns whether the rank must be plotted, i.e. its fingerprint changed or one of its generated files is missing.
+    '''
+    if manifest['ranks'].get(str(rank)) != fingerprint:
+        return True
+    return not all(exists(join(resultsDir, output)) for output in outputs)
@@ -65,7 +65,7 @@ def getCursorSignals(rawSigNames, result, resultData, pfFlatTIme, pscadInitTime)
     '''
     cursorSignalsDf = pd.DataFrame()
     
-    timeColName = 'time' if result.typ in (ResultType.EMT_INF, ResultType.EMT_PSOUT, ResultType.EMT_CSV, ResultType.EMT_ZIP) else resultData.columns[0]
+    timeColName = 'time' if result.typ in (ResultType.EMT_INF, ResultType.EMT_PSOUT, ResultType.EMT_CSV, ResultType.EMT_ZIP, ResultType.EMT_COLUMNAR) else resultData.columns[0]
     timeoffset = pfFlatTIme if result.typ == ResultType.RMS else pscadInitTime
     
     if timeColName in resultData.columns:
@@ -140,7 +140,7 @@ def addCursorMetrics(ranksCursor, dfCursorsList, result, resultData, settingsDic
     for i, cursor in enumerate(ranksCursor):
         if result.typ == ResultType.RMS:
             rawSigNames = cursor.rms_signals
-        elif result.typ in (ResultType.EMT_INF, ResultType.EMT_PSOUT, ResultType.EMT_CSV, ResultType.EMT_ZIP):
+        elif result.typ in (ResultType.EMT_INF, ResultType.EMT_PSOUT, ResultType.EMT_CSV, ResultType.EMT_ZIP, ResultType.EMT_COLUMNAR):
             rawSigNames = cursor.emt_signals
         else:
             print(f'File type: {result.typ} unknown')
@@ -3,6 +3,16 @@ import numpy as np
 import pandas as pd
 from scipy.signal import bilinear, lfilter, lfiltic
 from Result import ResultType
+from guide_kernels import pramp2Kernel, lfsmRampKernel
+
+# Signals used to calculate the guide results
+GUIDE_SIGNALS = ['time',
+                 'MTB\\mtb_s_pref_pu',
+                 'MTB\\mtb_s_pavail_pu',
+                 'MTB\\mtb_s_qref',
+                 'MTB\\mtb_s_qudroop',
+                 'MTB\\pll_f_hz',
+                 'MTB\\fft_pos_Vmag_pu']
 
 
 def genGuideResults(result, resultData, settingsDict, caseDf, pscadInitTime):
@@ -24,8 +34,8 @@ def genGuideResults(result, resultData, settingsDict, caseDf, pscadInitTime):
     '''
         
     # Use PSCAD result for calculating the guide response
-    if result.typ in (ResultType.EMT_INF, ResultType.EMT_PSOUT, ResultType.EMT_CSV, ResultType.EMT_ZIP):
-        guideData = resultData.copy()  # Make a copy of the original DataFrame to avoid modifying it directly
+    if result.typ in (ResultType.EMT_INF, ResultType.EMT_PSOUT, ResultType.EMT_CSV, ResultType.EMT_ZIP, ResultType.EMT_COLUMNAR):
+        guideData = resultData[[col for col in GUIDE_SIGNALS if col in resultData.columns]].copy()  # Copy only the signals used by the guides to avoid modifying the original DataFrame directly
         guideData['time'] = guideData.time - pscadInitTime
         
         # Generic LPF settings
@@ -59,7 +69,7 @@ def genGuideResults(result, resultData, settingsDict, caseDf, pscadInitTime):
             Pstep = caseDf['Event 1']['X1'].item()
             assert caseDf['Event 1']['X2'].item() == 0.0
             
-            guideData['P_pu_PoC_Ramp'] = pd.Series([guidePramp(Pref=P0, Pn=Pn, Tstep=Tstep, Pstep=Pstep, t=t) for t in guideData.time])
+            guideData['P_pu_PoC_Ramp'] = guidePramp(Pref=P0, Pn=Pn, Tstep=Tstep, Pstep=Pstep, t=guideData['time'].to_numpy())
             
             guideFigs.append('Ppoc')
             guideSignals.append('P_pu_PoC_Ramp')
@@ -84,10 +94,7 @@ def genGuideResults(result, resultData, settingsDict, caseDf, pscadInitTime):
             guideData['f_hz_Td_Lpf'] = guideLPF(guideData['f_hz_Td'], fc, 1/Ts) # Pass the delayed signal through an LPF
 
             if 'step' in caseDf['Case']['Name'].item() and not 'pstep' in caseDf['Case']['Name'].item(): # Run guideLFSM only for 'step', but not for 'pstep'
-                guideData['P_pu_LFSM_FFR'] = guideData['MTB\\mtb_s_pref_pu'].clip(upper=guideData['MTB\\mtb_s_pavail_pu']) # Create the 'dummy' active power reference signal clipped to the available power be to 'overwritten' below
-                for i, row in guideData.iterrows():
-                    PpuLFSM = guideLFSM(Pref=row['MTB\\mtb_s_pref_pu'], f=row['f_hz_Td_Lpf'], Pavail=row['MTB\\mtb_s_pavail_pu'], DK=DK, FSM=FSM, s_fsm=s_fsm, db=db)
-                    guideData.loc[i, 'P_pu_LFSM_FFR'] = PpuLFSM
+                guideData['P_pu_LFSM_FFR'] = guideLFSM(Pref=guideData['MTB\\mtb_s_pref_pu'].to_numpy(), f=guideData['f_hz_Td_Lpf'].to_numpy(), Pavail=guideData['MTB\\mtb_s_pavail_pu'].to_numpy(), DK=DK, FSM=FSM, s_fsm=s_fsm, db=db)
                                 
                 guideFigs.append('Ppoc')
                 guideSignals.append('P_pu_LFSM_FFR')                                   
@@ -130,17 +137,16 @@ def genGuideResults(result, resultData, settingsDict, caseDf, pscadInitTime):
             # Implement a LPF on the Upos to slow down the Q(U) response during an "instantaneous" LVFRT event
             guideData['fft_pos_Vmag_pu_lpf'] = guideLPF(guideData['MTB\\fft_pos_Vmag_pu'], fc_Upos, 1/Ts)
             
-            guideData['Q_pu_QU_Inst'] = Qref0      # Create new signal to populate
-            for i, row in guideData.iterrows():
-                if row['time'] < tThresh:
-                    continue
-                if row['fft_pos_Vmag_pu_lpf'] > vposFrtLimit: # No FRT
-                    QpuQU = guideQU(Uref=row['MTB\\mtb_s_qref'], Upos=row['fft_pos_Vmag_pu_lpf'], s=row['MTB\\mtb_s_qudroop'], Qref=Qref0) # Note: If Qmode == 'Q(U)', then 'mtb_s_qref' = Uref
-                    guideData.loc[i, 'Q_pu_QU_Inst'] = QpuQU 
-                else:
-                    # For the first index, keep the initialized value (Qref0); otherwise, use the previous value
-                    if i > guideData.index[0]:
-                        guideData.loc[i, 'Q_pu_QU_Inst'] = guideData.loc[i-1, 'Q_pu_QU_Inst']
+            time = guideData['time'].to_numpy()
+            UposLpf = guideData['fft_pos_Vmag_pu_lpf'].to_numpy()
+            noFrt = (time >= tThresh) & (UposLpf > vposFrtLimit)                # No FRT
+            hold = (time >= tThresh) & ~noFrt                                   # FRT, i.e. hold the previous value
+            
+            QpuQU = np.full(len(guideData), Qref0)                              # Initialized value (Qref0), also kept for t < tThresh
+            QpuQU[noFrt] = guideQU(Uref=guideData['MTB\\mtb_s_qref'].to_numpy()[noFrt], Upos=UposLpf[noFrt], s=guideData['MTB\\mtb_s_qudroop'].to_numpy()[noFrt], Qref=Qref0) # Note: If Qmode == 'Q(U)', then 'mtb_s_qref' = Uref
+            # Forward-fill the held samples with the last value not held; the first index keeps the initialized value (Qref0)
+            lastIdx = np.maximum.accumulate(np.where(hold, 0, np.arange(len(guideData))))
+            guideData['Q_pu_QU_Inst'] = QpuQU[lastIdx]
                 
             # Change LPF setting for Q(U)
             trise_QU = 0.95                                                     # Rise time [s]
@@ -258,22 +264,23 @@ def guidePramp(Pref, Pn, Tstep, Pstep, t):
         Pn in [MW] -- nominal power rating of the Power Park
         Tstep in [s] -- time step for the ramping
         Pstep in [pu] -- the new reference value of the Active Power *after ramping*   
-        t in [s] -- time at which the new value of P is calculated
+        t in [s] -- time(s) at which the new value of P is calculated, either a scalar or a NumPy array
 
     Returns:
-        Pramp in [pu] -- the new value of P after the ramping
+        Pramp in [pu] -- the new value(s) of P after the ramping
     '''
     m = min(0.2, 60/Pn)  # Limit the ramping to the minimum of either 0.2 pu/min or 60 MW/min
+    t = np.asarray(t)
     if Pstep > Pref:
         m =  m/60  # convert to pu/s
-        Pramp = Pref if t <= Tstep else m*(t-Tstep) + Pref
-        Pramp = Pstep if Pramp >= Pstep else Pramp # Ensure Pramp does not exceed the new reference value (Pstep)
+        Pramp = np.where(t <= Tstep, Pref, m*(t-Tstep) + Pref)
+        Pramp = np.where(Pramp >= Pstep, Pstep, Pramp) # Ensure Pramp does not exceed the new reference value (Pstep)
     else:
         m = -m/60  # convert to pu/s
-        Pramp = Pref if t <= Tstep else m*(t-Tstep) + Pref
-        Pramp = Pstep if Pramp <= Pstep else Pramp # Ensure Pramp does not go below the new reference value (Pstep)
+        Pramp = np.where(t <= Tstep, Pref, m*(t-Tstep) + Pref)
+        Pramp = np.where(Pramp <= Pstep, Pstep, Pramp) # Ensure Pramp does not go below the new reference value (Pstep)
         
-    return Pramp
+    return Pramp if Pramp.ndim else Pramp.item()
 
 def guidePramp2(Pref, Pn, Pavail, Ts, P):
     '''
@@ -298,24 +305,11 @@ def guidePramp2(Pref, Pn, Pavail, Ts, P):
     m = m/60              # Convert pu/min to pu/s
        
     # Convert Pandas Series to Numpy Array for added speed in doing difference equations below
-    Pref_array = np.asarray(Pref)
-    Pavail_array = np.asarray(Pavail)
-    P_array = np.asarray(P)
+    Pref_array = np.asarray(Pref, dtype=np.float64)
+    Pavail_array = np.asarray(Pavail, dtype=np.float64)
+    P_array = np.array(P, dtype=np.float64)     # Copy, as P is updated in place by the kernel
     
-    for k in range(1, len(P)):
-        if np.abs(Pref_array[k] - P_array[k-1]) > PThresh:
-            if Pref_array[k] - P_array[k-1] > 0:  # If P needs to increasing
-                P_array[k] = m*Ts + P_array[k-1]
-                if P_array[k] > Pref_array[k]:  # Ensure P does not exceed Pref / Pavail
-                    P_array[k] = Pref_array[k]
-            else: # If P needs to decreasing
-                P_array[k] = -m*Ts + P_array[k-1]
-                if P_array[k] < Pref_array[k]:  # Ensure P does not go below Pref
-                    P_array[k] = Pref_array[k]
-                if P_array[k] > Pavail_array[k]:  # Ensure P is clamped to Pavail if Pavail goes down suddenly
-                    P_array[k] = Pavail_array[k]
-        else: # Maintain current value of P
-            P_array[k] = P_array[k-1]            
+    pramp2Kernel(Pref_array, Pavail_array, P_array, m*Ts, PThresh)  # JIT-compiled if Numba is available, otherwise pure Python
         
     if isinstance(P, pd.Series):
         return pd.Series(P_array, index=P.index)
@@ -352,44 +346,18 @@ def guideLFSMRamp(Pref, Pn, Pavail, Ts, f, fTdLpf, P, DK, FSM, s_fsm, db):
     m = m/60              # Convert pu/min to pu/s
     fn = 50.0             # Nominal frequency in Hz
     
-    # Hysteresis band LOWER and UPPER band switches assuming we start at fn
-    LOWER = True        
-    UPPER = False
-    
+    if DK not in (1, 2):
+        print('"DK" can either be "1" or "2"!')    # P is set to 0 while LFSM is active, as by guideLFSM
+
     # Convert Pandas Series to Numpy Array for added speed in doing difference equations below
-    Pref_array = np.asarray(Pref)
-    Pavail_array = np.asarray(Pavail)
-    P_array = np.asarray(P)
-    f_array = np.asarray(f)
-    fTdLpf_array = np.asarray(fTdLpf)
+    Pref_array = np.asarray(Pref, dtype=np.float64)
+    Pavail_array = np.asarray(Pavail, dtype=np.float64)
+    P_array = np.array(P, dtype=np.float64)     # Copy, as P is updated in place by the kernel
+    f_array = np.asarray(f, dtype=np.float64)
+    fTdLpf_array = np.asarray(fTdLpf, dtype=np.float64)
     
-    Pref=Pref_array[0]
-    for k in range(1, len(P)):
-        # Activate active power ramping if the frequency is close to the nominal frequency
-        if np.abs(f_array[k] - fn) > fUpper:
-            UPPER = True
-            LOWER = False
-        elif np.abs(f_array[k] - fn) < fLower:
-            LOWER = True
-            UPPER = False
-        if LOWER:    # Ramping active
-            if np.abs(Pref_array[k] - P_array[k-1]) > PThresh:
-                if Pref_array[k] - P_array[k-1] > 0:  # If P needs to increasing
-                    P_array[k] = m*Ts + P_array[k-1]
-                    if P_array[k] > Pref_array[k]:  # Ensure P does not exceed Pref
-                        P_array[k] = Pref_array[k]
-                else: # If P needs to decreasing
-                    P_array[k] = -m*Ts + P_array[k-1]
-                    if P_array[k] < Pref_array[k]:  # Ensure P does not go below Pref
-                        P_array[k] = Pref_array[k]
-            else:   # Maintain current value of P
-                P_array[k] = P_array[k-1]
-            Pref = P_array[k] # The new reference is the current P value
-        elif UPPER:   # LFSM active
-            P_array[k] = guideLFSM(Pref=Pref, f=fTdLpf_array[k-1], Pavail=Pavail_array[k], DK=DK, FSM=FSM, s_fsm=s_fsm, db=db)
-        else: # Trapped inbetween hystersis band
-            print('How the hell did we end up trapped in the hysteresis loop!!')
-            sys.exit(1)
+    # JIT-compiled if Numba is available, otherwise pure Python
+    lfsmRampKernel(Pref_array, Pavail_array, P_array, f_array, fTdLpf_array, m*Ts, PThresh, fLower, fUpper, fn, int(DK), bool(FSM), float(s_fsm), float(db))
     
     if isinstance(P, pd.Series):
         return pd.Series(P_array, index=P.index)
@@ -402,6 +370,7 @@ def guideLFSM(Pref, f, Pavail=1.0, DK=1, FSM=False, s_fsm=10, db=0):
     This function calculates the new value of P given the
     frequency f, according to RfG (EU) 2016/631, 13.2 (a-d) and NC 2025
     (Version 4) for either DK1 or DK2
+    Pref, f and Pavail can either be scalars or NumPy arrays of the same length.
 
     Parameters:
         Pref in [pu] -- for Power Park Modules, Pref is the actual Active Power output     
@@ -425,11 +394,12 @@ def guideLFSM(Pref, f, Pavail=1.0, DK=1, FSM=False, s_fsm=10, db=0):
     '''
     Pn = 1.0 #pu
     fn = 50  #Hz
+    f = np.asarray(f)
     if DK == 1:
-        f1 = 50.2 if f > fn else 49.8
+        f1 = np.where(f > fn, 50.2, 49.8)
         s = 5
     elif DK == 2:
-        f1 = 50.5 if f > fn else 49.5
+        f1 = np.where(f > fn, 50.5, 49.5)
         s = 4
     else:
         print('"DK" can either be "1" or "2"!')
@@ -438,17 +408,12 @@ def guideLFSM(Pref, f, Pavail=1.0, DK=1, FSM=False, s_fsm=10, db=0):
     if FSM:
         Pref = guideFSM(Pref, f, DK, s_fsm, db)
         
-    if f > fn and f > f1 or f < fn and f < f1:
-        Pnew = Pref-100/s*(f-f1)/fn*Pn
-    else:
-        Pnew = Pref
+    Pnew = np.where((f > fn) & (f > f1) | (f < fn) & (f < f1), Pref-100/s*(f-f1)/fn*Pn, Pref)
         
-    if Pnew >= Pavail:
-        Pnew = Pavail  # Limit Active Power to Pavail
-    elif Pnew <= 0.0:
-        Pnew = 0.0  # Limit Active Power to 0.0 pu
+    Pnew = np.where(Pnew >= Pavail, Pavail,         # Limit Active Power to Pavail
+                    np.where(Pnew <= 0.0, 0.0, Pnew))  # Limit Active Power to 0.0 pu
 
-    return Pnew
+    return Pnew if Pnew.ndim else Pnew.item()
 
 
 def guideFSM(Pref, f, DK=1, s=10, db=0):
@@ -456,6 +421,7 @@ def guideFSM(Pref, f, DK=1, s=10, db=0):
     With Pref in pu, the function calculates the new value of P given the
     frequency f, for the FSM droop, s, according to RfG (EU) 2016/631, 15.2 (d)
     and NC 2025 (Version 4)
+    Pref and f can either be scalars or NumPy arrays of the same length.
 
     Parameters:
         Pref in [pu] -- for Power Park Modules, Pref is the actual Active Power output and not the nominal power
@@ -479,19 +445,19 @@ def guideFSM(Pref, f, DK=1, s=10, db=0):
         print('"DK" can either be "1" or "2"!')
         return 0
 
-    f = fRU if f < fRU else f
-    f = fRO if f > fRO else f
+    f = np.asarray(f)
+    f = np.where(f < fRU, fRU, f)
+    f = np.where(f > fRO, fRO, f)
     
-    if f<fn:
-        Pnew = Pref-100/s*(f-fn+db)/fn*Pn if f<fn-db else Pref
-    else:
-        Pnew = Pref-100/s*(f-fn-db)/fn*Pn if f>fn+db else Pref        
+    Pnew = np.where(f<fn,
+                    np.where(f<fn-db, Pref-100/s*(f-fn+db)/fn*Pn, Pref),
+                    np.where(f>fn+db, Pref-100/s*(f-fn-db)/fn*Pn, Pref))
     
     # Clamp Pnew to to be not exceed Pref by +/- 10%
-    if Pnew > Pref+0.1*Pn: Pnew = Pref+0.1*Pn
-    if Pnew < Pref-0.1*Pn: Pnew = Pref-0.1*Pn
+    Pnew = np.where(Pnew > Pref+0.1*Pn, Pref+0.1*Pn, Pnew)
+    Pnew = np.where(Pnew < Pref-0.1*Pn, Pref-0.1*Pn, Pnew)
     
-    return Pnew
+    return Pnew if Pnew.ndim else Pnew.item()
 
 
 def guideQU(Uref, Upos, s, Qref=0.0):
@@ -500,6 +466,8 @@ def guideQU(Uref, Upos, s, Qref=0.0):
     for voltage control mode based on RfG (EU) 2016/631, 21.3 (d) NC 2025
     (Version 4)
 
+    The inputs can either be scalars or NumPy arrays.
+
     Parameters:
         Uref in [pu] -- the voltage reference at the point of connection
         Upos in [pu] -- the magnitude of the positive sequence voltage at the 
@@ -515,14 +483,9 @@ def guideQU(Uref, Upos, s, Qref=0.0):
     
     dU = Uref-Upos
     dQ = 100*dU/Uref*Qnom/s      
-    if Qref + dQ > Qnom:
-        Qpoc_QU = Qnom
-    elif Qref + dQ < -Qnom:
-       Qpoc_QU = -Qnom 
-    else:
-        Qpoc_QU = Qref + dQ
+    Qpoc_QU = np.where(Qref + dQ > Qnom, Qnom, np.where(Qref + dQ < -Qnom, -Qnom, Qref + dQ))
         
-    return Qpoc_QU
+    return Qpoc_QU if Qpoc_QU.ndim else Qpoc_QU.item()
 
 
 def guideQpf(Ppoc, PFref): 
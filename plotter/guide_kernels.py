@@ -0,0 +1,139 @@
+'''
+Kernels for the sample-by-sample recurrences of the guide functions, i.e. the active power ramping of guidePramp2 and guideLFSMRamp.
+The recurrences cannot be vectorized, as each sample depends on the previous one, so the kernels are JIT-compiled with Numba if it is
+installed. Without Numba the very same functions run as plain Python loops.
+The kernels update the P array in place and only use scalar arithmetic in the same order as guideLFSM and guideFSM,
+so the compiled and the pure-Python kernels give identical results.
+'''
+import numpy as np
+
+try:
+    from numba import njit
+    JIT_AVAILABLE = True
+except ImportError:
+    JIT_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        '''
+        Fallback decorator used when Numba is not installed, i.e. the kernels run as pure Python.
+        '''
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def fsmKernel(Pref, f, DK, s, db):
+    '''
+    Scalar version of guide_functions.guideFSM for DK in [1, 2].
+    '''
+    Pn = 1.0 #pu
+    fn = 50  #Hz
+    if DK == 1:
+        fRU = 49.8
+        fRO = 50.2
+    else:
+        fRU = 49.5
+        fRO = 50.5
+
+    f = fRU if f < fRU else f
+    f = fRO if f > fRO else f
+
+    if f<fn:
+        Pnew = Pref-100/s*(f-fn+db)/fn*Pn if f<fn-db else Pref
+    else:
+        Pnew = Pref-100/s*(f-fn-db)/fn*Pn if f>fn+db else Pref
+
+    # Clamp Pnew to to be not exceed Pref by +/- 10%
+    if Pnew > Pref+0.1*Pn: Pnew = Pref+0.1*Pn
+    if Pnew < Pref-0.1*Pn: Pnew = Pref-0.1*Pn
+
+    return Pnew
+
+
+@njit(cache=True)
+def lfsmKernel(Pref, f, Pavail, DK, FSM, s_fsm, db):
+    '''
+    Scalar version of guide_functions.guideLFSM, i.e. 0 is returned if DK is not in [1, 2].
+    '''
+    Pn = 1.0 #pu
+    fn = 50  #Hz
+    if DK == 1:
+        f1 = 50.2 if f > fn else 49.8
+        s = 5
+    elif DK == 2:
+        f1 = 50.5 if f > fn else 49.5
+        s = 4
+    else:
+        return 0.0
+
+    if FSM:
+        Pref = fsmKernel(Pref, f, DK, s_fsm, db)
+
+    if f > fn and f > f1 or f < fn and f < f1:
+        Pnew = Pref-100/s*(f-f1)/fn*Pn
+    else:
+        Pnew = Pref
+
+    if Pnew >= Pavail:
+        Pnew = Pavail  # Limit Active Power to Pavail
+    elif Pnew <= 0.0:
+        Pnew = 0.0  # Limit Active Power to 0.0 pu
+
+    return Pnew
+
+
+@njit(cache=True)
+def pramp2Kernel(Pref, Pavail, P, mTs, PThresh):
+    '''
+    Recurrence of guide_functions.guidePramp2, with mTs the maximum change of P per sample. P is updated in place.
+    '''
+    for k in range(1, len(P)):
+        if np.abs(Pref[k] - P[k-1]) > PThresh:
+            if Pref[k] - P[k-1] > 0:  # If P needs to increasing
+                P[k] = mTs + P[k-1]
+                if P[k] > Pref[k]:  # Ensure P does not exceed Pref / Pavail
+                    P[k] = Pref[k]
+            else: # If P needs to decreasing
+                P[k] = -mTs + P[k-1]
+                if P[k] < Pref[k]:  # Ensure P does not go below Pref
+                    P[k] = Pref[k]
+                if P[k] > Pavail[k]:  # Ensure P is clamped to Pavail if Pavail goes down suddenly
+                    P[k] = Pavail[k]
+        else: # Maintain current value of P
+            P[k] = P[k-1]
+
+
+@njit(cache=True)
+def lfsmRampKernel(Pref, Pavail, P, f, fTdLpf, mTs, PThresh, fLower, fUpper, fn, DK, FSM, s_fsm, db):
+    '''
+    Recurrence of guide_functions.guideLFSMRamp, with mTs the maximum change of P per sample. P is updated in place.
+    '''
+    # Hysteresis band LOWER and UPPER band switches assuming we start at fn
+    LOWER = True
+    UPPER = False
+
+    PrefLFSM = Pref[0]
+    for k in range(1, len(P)):
+        # Activate active power ramping if the frequency is close to the nominal frequency
+        if np.abs(f[k] - fn) > fUpper:
+            UPPER = True
+            LOWER = False
+        elif np.abs(f[k] - fn) < fLower:
+            LOWER = True
+            UPPER = False
+        if LOWER:    # Ramping active
+            if np.abs(Pref[k] - P[k-1]) > PThresh:
+                if Pref[k] - P[k-1] > 0:  # If P needs to increasing
+                    P[k] = mTs + P[k-1]
+                    if P[k] > Pref[k]:  # Ensure P does not exceed Pref
+                        P[k] = Pref[k]
+                else: # If P needs to decreasing
+                    P[k] = -mTs + P[k-1]
+                    if P[k] < Pref[k]:  # Ensure P does not go below Pref
+                        P[k] = Pref[k]
+            else:   # Maintain current value of P
+                P[k] = P[k-1]
+            PrefLFSM = P[k] # The new reference is the current P value
+        elif UPPER:   # LFSM active
+            P[k] = lfsmKernel(PrefLFSM, fTdLpf[k-1], Pavail[k], DK, FSM, s_fsm, db)
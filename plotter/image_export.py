@@ -0,0 +1,62 @@
+'''
+Static image export of the plots and cursor tables with kaleido.
+All the images of a process are rendered through the one persistent kaleido renderer (Chromium subprocess) of the process.
+The renderer is started in a background thread when the worker process starts, i.e. its startup overlaps with loading the first
+results instead of delaying the first image export. The cursor table PDF pages are rendered to memory and merged without intermediate files.
+'''
+from __future__ import annotations
+from io import BytesIO
+from threading import Thread
+from typing import List, Union
+import plotly.graph_objects as go  # type: ignore
+import plotly.io as pio  # type: ignore
+
+_warmup: Union[Thread, None] = None
+
+
+def startRenderer() -> None:
+    '''
+    Starts the kaleido renderer of the process in the background by rendering an empty figure.
+    '''
+    global _warmup
+    if _warmup is None:
+        _warmup = Thread(target=warmupRenderer, daemon=True)
+        _warmup.start()
+
+
+def warmupRenderer() -> None:
+    try:
+        pio.to_image(go.Figure(), format='png', width=10, height=10, engine='kaleido')
+    except Exception:
+        pass                                                                                                                        # Reported by the first actual image export
+
+
+def renderImage(fig: go.Figure, imageFormat: str, width: int, height: Union[int, None] = None) -> bytes:
+    '''
+    Renders the figure to an image of the given format through the persistent kaleido renderer of the process.
+    '''
+    if _warmup is not None:
+        _warmup.join()                                                                                                              # The renderer must not be used by two threads at once
+    return pio.to_image(fig, format=imageFormat, width=width, height=height, engine='kaleido')
+
+
+def exportImage(fig: go.Figure, filePath: str, imageFormat: str, width: int, height: Union[int, None] = None) -> None:
+    '''
+    Renders the figure and writes the image to filePath.
+    '''
+    image = renderImage(fig, imageFormat, width, height)
+    with open(filePath, 'wb') as file:
+        file.write(image)
+
+
+def exportPdfPages(figures: List[go.Figure], filePath: str, width: int) -> None:
+    '''
+    Renders each figure as a PDF page and writes the merged PDF to filePath.
+    '''
+    from pypdf import PdfReader, PdfWriter
+
+    merger = PdfWriter()
+    for fig in figures:
+        merger.append(PdfReader(BytesIO(renderImage(fig, 'pdf', width))))
+    merger.write(filePath)
+    merger.close()
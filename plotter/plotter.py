@@ -2,14 +2,19 @@
 Minimal script to plot simulation results from PSCAD and PowerFactory.
 '''
 from __future__ import annotations
-from os import listdir, makedirs, remove
-from os.path import abspath, join, split, exists
+from os import makedirs
+import argparse
+from os.path import abspath, dirname, join, split, exists
 import re
+import hashlib
 import numpy as np
 import pandas as pd
 from plotly.subplots import make_subplots  # type: ignore
 import plotly.graph_objects as go  # type: ignore
-from typing import List, Dict, Union, Tuple, Set
+import plotly.io as pio  # type: ignore
+from plotly.io.json import to_json_plotly  # type: ignore
+from plotly.offline import get_plotlyjs  # type: ignore
+from typing import Callable, List, Dict, Union, Tuple, Set
 from sampling_functions import downSample
 import multiprocessing
 import sys
@@ -19,12 +24,19 @@ from read_configs import ReadConfig, readFigureSetup, readCursorSetup
 from Figure import Figure
 from Result import ResultType, Result
 from Cursor import Cursor
-from read_and_write_functions import loadEMT
+from read_and_write_functions import loadEMT, loadRMS
 from process_results import getColNames, getUniqueEmtSignals
 from process_psout import findPsoutSignalPath, getPsoutSignals
 from cursor_functions import setupCursorDataFrame, addCursorMetrics
-from guide_functions import genGuideResults
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from guide_functions import genGuideResults, GUIDE_SIGNALS
+from result_cache import getCachePath, readResultCache, writeResultCache, readColumnarResult
+from image_export import exportImage, exportPdfPages, startRenderer
+from build_manifest import isRankStale, markRankPlotted, rankFingerprint, rankOutputs, readManifest, writeManifest
+from scan_index import scanResultFiles
+from watch_results import WATCH_INTERVAL, ResultWatcher, readTaskIdRanks
+from trace_pyramid import PYRAMID_JS, create_pyramid_js, getPyramidDir, writePyramid
+from task_scheduling import estimateRankCost, estimateRankMemory, memoryBudget, orderTasksByCost, parallelEfficiency, resolveWorkers, scheduleTasks
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 import warnings
 
@@ -34,6 +46,14 @@ except:
     print('Failed to open log file. Logging to file disabled.')
     LOG_FILE = None  # type: ignore
 
+__version__ = '1.0.0'     # Increase when a change to the plotter changes the generated files, i.e. incremental runs re-plot all ranks
+
+HTML_PAGE_WIDTH_PX = 1920  # Assumed width of the html pages in pixels
+PLOTLY_JS = 'plotly.min.js'
+FIGURES_JS = 'mtb_figures.js'
+MATHJAX_CDN = 'https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-chtml.js'
+FONT_AWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/4.7.0/css/font-awesome.min.css'
+
 # To suppress Numpy divide error messages
 np.seterr(divide='ignore', invalid='ignore')                                    
 
@@ -65,7 +85,7 @@ def idFile(filePath: str) -> Tuple[
     Identifies the type (EMT or RMS), root and case id of a given file. If the file is not recognized, a none tuple is returned.
     '''
     path, fileName = split(filePath)
-    match = re.match(r'^(\w+?)_([0-9]+).(inf|csv|psout|zip|gz|bz2|xz)$', fileName.lower())
+    match = re.match(r'^(\w+?)_([0-9]+).(inf|csv|psout|zip|gz|bz2|xz|parquet|feather|npz)$', fileName.lower())
     if match:
         rank = int(match.group(2))
         projectName = match.group(1)
@@ -77,6 +97,9 @@ def idFile(filePath: str) -> Tuple[
         elif match.group(3) == 'zip' or match.group(3) == 'gz' or match.group(3) == 'bz2' or match.group(3) == 'xz':
             fileType = ResultType.EMT_ZIP
             return (fileType, rank, projectName, bulkName, fullpath)
+        elif match.group(3) == 'parquet' or match.group(3) == 'feather' or match.group(3) == 'npz':
+            fileType = ResultType.EMT_COLUMNAR
+            return (fileType, rank, projectName, bulkName, fullpath)
         else:
             with open(filePath, 'r') as file:
                 firstLine = file.readline()
@@ -98,21 +121,19 @@ def idFile(filePath: str) -> Tuple[
 def mapResultFiles(config: ReadConfig) -> Dict[int, List[Result]]:
     '''
     Goes through all files in the given directories and maps them to a dictionary of cases.
+    With the scan index enabled, unchanged files are identified without opening them.
     '''
-    files: List[Tuple[str, str]] = list()
+    files: List[Tuple] = list()
     for dir_ in config.simDataDirs:
-        for file_ in listdir(dir_[1]):
-            files.append((dir_[0], join(dir_[1], file_)))
+        for identified in scanResultFiles(dir_[1], idFile, config.scanIndex):
+            files.append((dir_[0],) + identified)
     
     results: Dict[int, List[Result]] = dict()
 
     for file in files:
         group = file[0]
-        fullpath = file[1]
-        typ, rank, projectName, bulkName, fullpath = idFile(fullpath)
+        typ, rank, projectName, bulkName, fullpath = file[1:]
 
-        if typ is None:
-            continue
         assert rank is not None
         assert projectName is not None
         assert bulkName is not None
@@ -149,7 +170,7 @@ def colorMap(results: Dict[int, List[Result]]) -> Dict[str, List[str]]:
     cMap: Dict[str, List[str]] = dict()
 
     i = 0
-    for p in list(projects):
+    for p in sorted(projects):                                                  # Sorted, to keep the colors the same between runs
         cMap[p] = colors[i:i + 3]
         i += 3
         if i >= 21:
@@ -160,98 +181,169 @@ def colorMap(results: Dict[int, List[Result]]) -> Dict[str, List[str]]:
     return cMap
 
 
-def addResults(plots: List[go.Figure],
+def addResults(plotSets: List[Tuple[List[go.Figure], int]],
                result, # result object
                resultData: pd.DataFrame,
                figures: List[Figure],
                colors,
-               nColumns: int,
                settingsDict, # project settings
                caseDf, # case MTB setting
-               genGuide: bool
+               genGuide: bool,
+               pixelWidth: int,
+               pyramid: Union[Tuple[str, int], None] = None
                ) -> None:
     '''
-    Adds simulation results for a specific case/rank to a set of Plotly figures or a single subplot.
+    Adds simulation results for a specific case/rank to one or more sets of Plotly figures or single subplots, e.g. the html and image plots.
+    The guide results and the downsampled traces are calculated once and added to all the plot sets.
 
     Parameters:
-        plots (List[go.Figure]): List of Plotly figures to which results will be added.
+        plotSets (List[Tuple[List[go.Figure], int]]): List of (plots, nColumns) tuples, i.e. the Plotly figures to which results will be added
+                                                      and the number of columns for subplot arrangement.
         result: Result object containing metadata and file information for the simulation result.
         resultData (pd.DataFrame): DataFrame containing the simulation result data.
         figures (List[Figure]): List of Figure objects specifying plot configuration.
         colors (Dict[str, List[str]]): Dictionary mapping project names to color lists.
-        nColumns (int): Number of columns for subplot arrangement.
         settingsDict: Dictionary of project settings.
-        rankNameDict: Dictionary with Case Rank & Case Name
         caseDf: DataFrame containing MTB case settings for the current rank.
+        pixelWidth (int): Width of the plots in pixels, used for the automatic point budget of the downsampling.
+        pyramid (Tuple[str, int]): Folder and max. number of samples of the zoom pyramids of the signals, None to disable the zoom pyramids.
 
     Returns:
         None
     '''
 
-    SUBPLOT = (len(plots) == 1) # Check if output should be a subplot
+    guide = genGuideResults(result, resultData, settingsDict,  caseDf, settingsDict['PSCAD Initialization time']) if genGuide else None
     
-    pfFlatTIme = settingsDict['PF flat time']
-    pscadInitTime = settingsDict['PSCAD Initialization time']
-    
-    if genGuide: guide = genGuideResults(result, resultData, settingsDict,  caseDf, pscadInitTime)
-    
-    rowPos = 1
-    colPos = 1
-    
-    fi = -1
-    for figure in figures:
-        fi += 1
+    traceCache: Dict[Tuple, Tuple] = dict()
+    for fi, figure in enumerate(figures):
+        addFigureResults(plotSets, fi, figure, result, resultData, guide, colors, settingsDict, traceCache, pixelWidth, pyramid)
+
+
+def addFigureResults(plotSets: List[Tuple[List[go.Figure], int]],
+                     fi: int,
+                     figure: Figure,
+                     result: Result,
+                     resultData: pd.DataFrame,
+                     guide: Union[Dict, None],
+                     colors,
+                     settingsDict,
+                     traceCache: Dict[Tuple, Tuple],
+                     pixelWidth: int,
+                     pyramid: Union[Tuple[str, int], None] = None
+                     ) -> None:
+    '''
+    Adds the simulation result signals (and guide results if given) of a single figure, i.e. the fi'th figure of the figure list,
+    to the individual Plotly figure or to the subplot of the figure of each plot set.
+    resultData only needs to hold the time column and the signals of the given figure.
+    '''
+    traces = figureTraces(figure, result, resultData, guide, settingsDict, traceCache, pixelWidth, pyramid)
+    for plots, nColumns in plotSets:
+        SUBPLOT = (len(plots) == 1) # Check if output should be a subplot
 
         if not SUBPLOT: # Make use of individual plots
             plotlyFigure = plots[fi]
+            rowPos = 1
+            colPos = 1
         else:           # Make use of subplots
             plotlyFigure = plots[0]
             rowPos = (fi // nColumns) + 1
             colPos = (fi % nColumns) + 1
 
-        downsampling_method = figure.down_sampling_method
-        timeColName = 'time' if result.typ in (ResultType.EMT_INF, ResultType.EMT_PSOUT, ResultType.EMT_CSV, ResultType.EMT_ZIP) else resultData.columns[0]
-        timeoffset = pfFlatTIme if result.typ == ResultType.RMS else pscadInitTime
-
-        if genGuide:        
-            # Add guide result plots
-            if figure.title in guide['figs']:
-                indices = []
-                for i, fig in enumerate(guide['figs']):
-                    if figure.title in fig:
-                        indices.append(i)
-                      
-                traces = 0 
-                for i in indices:                
-                    x_value = guide['data']['time']
-                    y_value = guide['data'][guide['signals'][i]]
-                    x_value, y_value = downSample(x_value, y_value, downsampling_method, figure.gradient_threshold)
-                    add_scatterplot_for_result(colPos, 'dash', colors, 'guide:'+guide['signals'][i], SUBPLOT, plotlyFigure, 'guide', rowPos,
-                                            traces, x_value, y_value)
-                    traces += 1
-            
-        traces = 0
-        for sig in range(1, 4):
-            signalKey = result.typ.name.lower().split('_')[0]
-            rawSigName: str = getattr(figure, f'{signalKey}_signal_{sig}')
-            sigColName, sigDispName = getColNames(rawSigName, result)
+        for dash, displayName, resultName, trace, x_value, y_value, meta in traces:
+            add_scatterplot_for_result(colPos, dash, colors, displayName, SUBPLOT, plotlyFigure, resultName, rowPos,
+                                       trace, x_value, y_value, meta)
+        
+        update_y_and_x_axis(figure, plotlyFigure, SUBPLOT, rowPos, colPos)
 
-            if sigColName in resultData.columns:
-                x_value = resultData[timeColName] - timeoffset  # type: ignore
-                y_value = resultData[sigColName]  # type: ignore
-                x_value, y_value = downSample(x_value, y_value, downsampling_method, figure.gradient_threshold)
-                add_scatterplot_for_result(colPos, 'solid', colors, sigDispName, SUBPLOT, plotlyFigure, result.shorthand, rowPos,
-                                           traces, x_value, y_value)
 
-                # plot_cursor_functions.add_annotations(x_value, y_value, plotlyFigure)
-                traces += 1
-            elif sigColName != '':
-                print(f'Signal "{rawSigName}" not recognized in resultfile: {result.fullpath}')
-                add_scatterplot_for_result(colPos, 'solid', colors, f'{sigDispName} (Unknown)', SUBPLOT, plotlyFigure, result.shorthand, rowPos,
-                                           traces, None, None)
+def figureTraces(figure: Figure,
+                 result: Result,
+                 resultData: pd.DataFrame,
+                 guide: Union[Dict, None],
+                 settingsDict,
+                 traceCache: Dict[Tuple, Tuple],
+                 pixelWidth: int,
+                 pyramid: Union[Tuple[str, int], None] = None
+                 ) -> List[Tuple]:
+    '''
+    Returns the (dash, displayName, resultName, trace, x_value, y_value, meta) traces of the guide results and simulation result signals of the figure.
+    The downsampled signals are memoized in traceCache by signal and downsampling settings, i.e. a signal plotted in several figures
+    with the same downsampling settings is only downsampled once. If pyramid is given, the zoom pyramid of each signal is written
+    (once) and its manifest is returned as the trace meta data.
+    '''
+    sampling = figure.sampling(pixelWidth)
+    timeColName = 'time' if result.typ in (ResultType.EMT_INF, ResultType.EMT_PSOUT, ResultType.EMT_CSV, ResultType.EMT_ZIP, ResultType.EMT_COLUMNAR) else resultData.columns[0]
+    timeoffset = settingsDict['PF flat time'] if result.typ == ResultType.RMS else settingsDict['PSCAD Initialization time']
+
+    figureTraceList: List[Tuple] = list()
+    if guide is not None:        
+        # Add guide result plots
+        if figure.title in guide['figs']:
+            indices = []
+            for i, fig in enumerate(guide['figs']):
+                if figure.title in fig:
+                    indices.append(i)
+                  
+            traces = 0 
+            for i in indices:                
+                key = ('guide', guide['signals'][i]) + sampling
+                if key not in traceCache:
+                    traceCache[key] = plotArrays(*downSample(guide['data']['time'], guide['data'][guide['signals'][i]], *sampling))
+                meta = pyramidMeta(result, ('guide', guide['signals'][i]), guide['data']['time'], guide['data'][guide['signals'][i]], traceCache, pyramid)
+                figureTraceList.append(('dash', 'guide:'+guide['signals'][i], 'guide', traces) + traceCache[key] + (meta,))
                 traces += 1
         
-        update_y_and_x_axis(figure, plotlyFigure, SUBPLOT, rowPos, colPos)
+    traces = 0
+    for sig in range(1, 4):
+        signalKey = result.typ.name.lower().split('_')[0]
+        rawSigName: str = getattr(figure, f'{signalKey}_signal_{sig}')
+        sigColName, sigDispName = getColNames(rawSigName, result)
+
+        if sigColName in resultData.columns:
+            key = ('result', sigColName) + sampling
+            if key not in traceCache or pyramid is not None and ('pyramid', 'result', sigColName) not in traceCache:
+                x_value = resultData[timeColName] - timeoffset  # type: ignore
+                y_value = resultData[sigColName]  # type: ignore
+                if key not in traceCache:
+                    traceCache[key] = plotArrays(*downSample(x_value, y_value, *sampling))
+                pyramidMeta(result, ('result', sigColName), x_value, y_value, traceCache, pyramid)
+            meta = traceCache[('pyramid', 'result', sigColName)][0] if pyramid is not None else None
+            figureTraceList.append(('solid', sigDispName, result.shorthand, traces) + traceCache[key] + (meta,))
+
+            # plot_cursor_functions.add_annotations(x_value, y_value, plotlyFigure)
+            traces += 1
+        elif sigColName != '':
+            print(f'Signal "{rawSigName}" not recognized in resultfile: {result.fullpath}')
+            figureTraceList.append(('solid', f'{sigDispName} (Unknown)', result.shorthand, traces, None, None, None))
+            traces += 1
+
+    return figureTraceList
+
+
+def plotArrays(x_value, y_value) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Returns the downsampled trace as float64 time and float32 value arrays. Plotly embeds numpy arrays in the html pages as base64
+    encoded typed arrays, i.e. the float32 values halve the size of the values and the time keeps the precision of small time steps.
+    '''
+    x_value = np.asarray(x_value, dtype=np.float64)
+    y_value = np.asarray(y_value)
+    if y_value.dtype == object:
+        y_value = pd.to_numeric(y_value, errors='coerce')
+    return x_value, y_value.astype(np.float32)
+
+
+def pyramidMeta(result: Result, signal: Tuple, x_value, y_value, traceCache: Dict[Tuple, Tuple], pyramid: Union[Tuple[str, int], None]) -> Union[Dict, None]:
+    '''
+    Writes the zoom pyramid of the signal (once per result and signal) and returns the trace meta data holding the pyramid manifest.
+    Returns None if the zoom pyramids are disabled.
+    '''
+    if pyramid is None:
+        return None
+    key = ('pyramid',) + signal
+    if key not in traceCache:
+        pyramidKey = hashlib.sha1(repr((result.fullpath,) + signal).encode('utf-8')).hexdigest()[:12]
+        traceCache[key] = ({'pyramid': writePyramid(pyramid[0], pyramidKey, x_value, y_value, pyramid[1])},)
+    return traceCache[key][0]
 
 
 def update_y_and_x_axis(figure, plotlyFigure, SUBPLOT, rowPos, colPos):
@@ -278,7 +370,7 @@ def update_y_and_x_axis(figure, plotlyFigure, SUBPLOT, rowPos, colPos):
 
 
 def add_scatterplot_for_result(colPos, dash, colors, displayName, SUBPLOT, plotlyFigure, resultName, rowPos, traces, x_value,
-                               y_value):
+                               y_value, meta=None):
     if not SUBPLOT:
         plotlyFigure.add_trace(  # type: ignore
             go.Scatter(
@@ -288,7 +380,8 @@ def add_scatterplot_for_result(colPos, dash, colors, displayName, SUBPLOT, plotl
                 line_color=colors[resultName][traces],
                 name=displayName,
                 legendgroup=displayName,
-                showlegend=True
+                showlegend=True,
+                meta=meta
             )
         )
     else:
@@ -300,7 +393,8 @@ def add_scatterplot_for_result(colPos, dash, colors, displayName, SUBPLOT, plotl
                 line_color=colors[resultName][traces],
                 name=displayName,
                 legendgroup=resultName,
-                showlegend=True
+                showlegend=True,
+                meta=meta
             ),
             row=rowPos, col=colPos
         )
@@ -401,7 +495,7 @@ def genCursorPlotlyTables(ranksCursor, dfCursorsList):
     return goCursorList    
 
    
-def genCursorHTML(htmlCursorColumns, goCursorList, rank, rankName):
+def genCursorHTML(htmlCursorColumns, goCursorList, rank, rankName, htmlAssets='cdn'):
     '''
     Generates HTML for cursor plots, including a table of contents with links to each cursor plot.
     '''
@@ -431,11 +525,7 @@ def genCursorHTML(htmlCursorColumns, goCursorList, rank, rankName):
                          'displaylogo': True    # Optional: Hide Plotly logo for this plot
                          # Add any other plot-specific config options here
                         }
-        cursor_html = goCursor.to_html(full_html=False,
-                                       include_plotlyjs='cdn',
-                                       include_mathjax='cdn',
-                                       default_width='100%',
-                                       config=cursor_config)        
+        cursor_html = figureToHtml(goCursor, f'Cursor-{cursor_ref}', cursor_config, htmlAssets)
         html += f'<td><div id="{cursor_ref}">' + cursor_html + '</div></td>'  # type: ignore
         if ((i+1) % htmlCursorColumns) == 0:
             html += '</tr>'
@@ -446,26 +536,216 @@ def genCursorHTML(htmlCursorColumns, goCursorList, rank, rankName):
 
 def genCursorPDF(goCursorList, rank, rankName, cursorPath):
     '''
-    Generates PDF for cursor plots
+    Generates PDF for cursor plots, one page per cursor table
     '''
-    cursor_pdf_filenames = []
-    for i, goCursor in enumerate(goCursorList):
-        cursor_pdf_filename = f'{cursorPath}_{i:02d}.pdf'
-        cursor_pdf_filenames.append(cursor_pdf_filename)
-        goCursor.write_image(cursor_pdf_filename, width=1000)
-        
-    merger = PdfWriter()
+    exportPdfPages(goCursorList, f'{cursorPath}.pdf', width=1000)
+
+
+def resultSignals(result: Result, figureList: List[Figure], ranksCursor: List[Cursor]) -> Union[List, None]:
+    '''
+    Returns the signals loaded from the result file, i.e. the signals of the figures for .psout files and the columns of the figures and
+    cursors for RMS results, which are also part of the result cache key. Returns None if the whole result file is loaded.
+    '''
+    if result.typ == ResultType.EMT_PSOUT:
+        return getUniqueEmtSignals(figureList)                                                                                      # Make sure there are no duplicate signals
+    if result.typ == ResultType.RMS:
+        columns = [col for figure in figureList for col in figureColumns(figure, result)]
+        columns += [getColNames(rawSigName, result)[0] for cursor in ranksCursor for rawSigName in cursor.rms_signals]
+        return list(dict.fromkeys(columns))
+    return None
+
+
+def loadResultData(result: Result, figureList: List[Figure], config: ReadConfig, ranksCursor: List[Cursor]) -> Union[pd.DataFrame, None]:
+    '''
+    Loads the simulation result data of the given result. If the result cache is enabled, the extracted signals
+    are read from and written to the result cache, to avoid parsing the result files again in subsequent runs.
+    Only the signals of the figures (and cursors for RMS results) are loaded from .psout and RMS result files.
+    Returns None if the result type is not supported.
+    '''
+    signalPathNames = resultSignals(result, figureList, ranksCursor)
+    if config.resultCache:
+        cachePath = getCachePath(result, signalPathNames, config.cacheFormat, config.psoutDtype)
+        resultData = readResultCache(cachePath)
+        if resultData is not None:
+            print(f'Loaded {result.fullpath} from result cache')
+            return resultData
+
+    if result.typ == ResultType.RMS:
+        resultData = loadRMS(result.fullpath, signalPathNames)
+    elif result.typ == ResultType.EMT_INF:
+        resultData = loadEMT(result.fullpath)
+    elif result.typ == ResultType.EMT_PSOUT:
+        assert signalPathNames is not None
+        resultData = loadPsoutResult(result.fullpath, signalPathNames, findMtbPath(result.fullpath, signalPathNames[0]), config.psoutDtype)
+    elif result.typ == ResultType.EMT_CSV or result.typ == ResultType.EMT_ZIP:
+        resultData = pd.read_csv(result.fullpath, sep=';', decimal=',')  # type: ignore
+    elif result.typ == ResultType.EMT_COLUMNAR:
+        resultData = readColumnarResult(result.fullpath)
+    else:
+        return None
+
+    if config.resultCache:
+        writeResultCache(cachePath, resultData, getSignalUnits(result, figureList))
+        if config.cacheFormat == 'mmap':
+            storeData = readResultCache(cachePath)                                                                                  # Use the memory-mapped signals, also in the first run
+            if storeData is not None:
+                resultData = storeData
+    return resultData
+
+
+def findMtbPath(psoutFilePath: str, referenceSignal: str) -> str:
+    '''
+    Returns the path of the MTB instance in the .psout file. Exits if the MTB is not found.
+    '''
+    # Use the reference signal, i.e. 'MTB\\mtb_s_pavail_pu' to find the location of the MTB instances (just to check if the MTB is not maybe placed on a different canvas than 'Main')
+    mtbPaths = findPsoutSignalPath(psoutFilePath, referenceSignal)
+    if mtbPaths is None:
+        print('ERROR: MTB not found!')
+        sys.exit(0)
+    return mtbPaths[0]                                                                                                              # There should one be one instance
+
+
+def loadPsoutResult(psoutFilePath: str, signalPathNames: List[str], mtbPath: str, dtype: str) -> pd.DataFrame:
+    '''
+    Loads the given signals of the .psout file, with the 'MTB\\' signals located at the given MTB instance path.
+    The first signal is used as the time reference.
+    '''
+    if mtbPath != 'MTB':
+        signalPathNames = [s.replace('MTB\\', mtbPath + '\\', 1) if s.startswith('MTB\\') else s for s in signalPathNames]          # Replace the relative path 'MTB\\' with the correct signal path with respect to 'Root/Main/' for all MTB signal, if necessary
+    resultData = getPsoutSignals(psoutFilePath, signalPathNames, dtype)                                                             # Get all the signals in the .psout file as a Pandas DataFrame
+    prefix_to_remove = mtbPath.replace('MTB', '', 1)
+    if prefix_to_remove != '\\':
+        resultData.columns = [col.removeprefix(prefix_to_remove) if 'MTB\\' in col else col for col in resultData.columns]          # Remove the path in front of all 'MTB\\signalName' columns in the DataFrame to reduce the legend lenght in the plots
+    return resultData
 
-    for pdf in cursor_pdf_filenames:
-        merger.append(pdf)
-        remove(pdf)
-    
-    merger.write(f'{cursorPath}.pdf')
-    merger.close()
+
+def resultColumnLoader(result: Result, figureList: List[Figure], ranksCursor: List[Cursor], config: ReadConfig) -> Union[Callable[[List], Union[pd.DataFrame, None]], None]:
+    '''
+    Returns a function loading only the given columns (and always the time column) of the result, used by the streaming mode.
+    The columns are read from the result cache (if there is a cache entry), the .psout file or the columnar result file.
+    The text result files cannot be read per column, so they are loaded in full once, and then read back from the result cache
+    if it is enabled. Returns None if the result type is not supported.
+    '''
+    signalPathNames = resultSignals(result, figureList, ranksCursor)
+    cachePath = getCachePath(result, signalPathNames, config.cacheFormat, config.psoutDtype) if config.resultCache else None
+    if cachePath is not None and exists(cachePath):
+        print(f'Streaming {result.fullpath} from result cache')
+        return lambda columns: readResultCache(cachePath, columns)
+
+    if result.typ == ResultType.EMT_PSOUT:
+        assert signalPathNames is not None
+        mtbPath = findMtbPath(result.fullpath, signalPathNames[0])
+        return lambda columns: loadPsoutResult(result.fullpath, [signalPathNames[0]] + [col for col in columns if col != 'time' and col != signalPathNames[0]], mtbPath, config.psoutDtype)
+    elif result.typ == ResultType.EMT_COLUMNAR:
+        return lambda columns: readColumnarResult(result.fullpath, columns)
+
+    resultData = loadResultData(result, figureList, config, ranksCursor)
+    if resultData is None:
+        return None
+    if cachePath is not None and exists(cachePath):
+        del resultData                                                                                                              # Release the parsed result, the figures are read from the cache
+        return lambda columns: readResultCache(cachePath, columns)
+    return lambda columns: resultData
+
+
+def streamResult(result: Result,
+                 figureList: List[Figure],
+                 ranksCursor: List[Cursor],
+                 dfCursorsList: List[pd.DataFrame],
+                 htmlPlots: List[go.Figure],
+                 imagePlots: List[go.Figure],
+                 colorMap: Dict[str, List[str]],
+                 settingsDict,
+                 caseDf,
+                 config: ReadConfig,
+                 pyramid: Union[Tuple[str, int], None] = None) -> None:
+    '''
+    Adds the result to the plots and cursor tables one figure at a time, i.e. only the signals of the current figure are loaded, downsampled
+    and added to the plots, before the signals of the next figure are loaded. The peak memory then scales with the largest figure instead
+    of the whole result file.
+    '''
+    loadColumns = resultColumnLoader(result, figureList, ranksCursor, config)
+    if loadColumns is None:
+        return
+
+    guide = None
+    if config.genGuide:
+        guideData = loadColumns(GUIDE_SIGNALS[1:])
+        if guideData is not None:
+            guide = genGuideResults(result, guideData, settingsDict, caseDf, settingsDict['PSCAD Initialization time'])
+        del guideData
+
+    plotSets = outputPlotSets(htmlPlots, imagePlots, config)
+    traceCache: Dict[Tuple, Tuple] = dict()
+    for fi, figure in enumerate(figureList):
+        figureData = loadColumns(figureColumns(figure, result))
+        if figureData is None:
+            continue
+        addFigureResults(plotSets, fi, figure, result, figureData, guide, colorMap, settingsDict, traceCache, plotPixelWidth(config), pyramid)
+        del figureData                                                                                                              # Release the signals before loading the next figure
+
+    if len(ranksCursor) > 0:
+        cursorData = loadColumns([getColNames(rawSigName, result)[0] for cursor in ranksCursor 
+                                  for rawSigName in (cursor.rms_signals if result.typ == ResultType.RMS else cursor.emt_signals)])
+        if cursorData is not None:
+            addCursorMetrics(ranksCursor, dfCursorsList, result, cursorData, settingsDict, caseDf)
+
+
+def outputPlotSets(htmlPlots: List[go.Figure], imagePlots: List[go.Figure], config: ReadConfig) -> List[Tuple[List[go.Figure], int]]:
+    '''
+    Returns the (plots, nColumns) plot sets of the enabled outputs, i.e. html and/or image.
+    '''
+    plotSets: List[Tuple[List[go.Figure], int]] = list()
+    if config.genHTML:
+        plotSets.append((htmlPlots, config.htmlColumns))
+    if config.genImage:
+        plotSets.append((imagePlots, config.imageColumns))
+    return plotSets
+
+
+def plotPixelWidth(config: ReadConfig) -> int:
+    '''
+    Returns the width in pixels of the widest single plot of the enabled outputs, i.e. the resolution the downsampled traces are shown at.
+    The html plots are assumed to share a full HD page width.
+    '''
+    widths = list()
+    if config.genHTML:
+        widths.append(HTML_PAGE_WIDTH_PX // config.htmlColumns)
+    if config.genImage:
+        widths.append(2000 if config.imageColumns == 1 else 700)                                                                    # See create_image_plots
+    return max(widths, default=HTML_PAGE_WIDTH_PX)
+
+
+def figureColumns(figure: Figure, result: Result) -> List:
+    '''
+    Returns the result column names of the signals plotted in the given figure.
+    '''
+    signalKey = result.typ.name.lower().split('_')[0]
+    columns = list()
+    for sig in range(1, 4):
+        sigColName, _ = getColNames(getattr(figure, f'{signalKey}_signal_{sig}'), result)
+        if sigColName != '':
+            columns.append(sigColName)
+    return columns
+
+
+def getSignalUnits(result: Result, figureList: List[Figure]) -> Dict:
+    '''
+    Returns a dictionary with the result column names as keys and the units of the figures they are plotted in as values.
+    '''
+    units = dict()
+    signalKey = result.typ.name.lower().split('_')[0]
+    for figure in figureList:
+        for sig in range(1, 4):
+            sigColName, _ = getColNames(getattr(figure, f'{signalKey}_signal_{sig}'), result)
+            if sigColName != '':
+                units[sigColName] = figure.units
+    return units
 
 
 def drawPlot(rank: int,
-             resultDict: Dict[int, List[Result]],
+             resultList: List[Result],
+             rankList: List[int],
              figureDict: Dict[int, List[Figure]],
              casesDf, # Pandas DataFrame
              colorMap: Dict[str, List[str]],
@@ -481,9 +761,6 @@ def drawPlot(rank: int,
     
     print(f'Drawing plot for Rank {rank}: {rankName}')
 
-    resultList = resultDict.get(rank, [])
-    rankList = list(resultDict.keys())
-    rankList.sort()
     figureList = figureDict.get(rank, figureDict.get(-1, []))
     ranksCursor = [i for i in cursorDict if i.id == rankNameDict.get(rank, [])]
 
@@ -496,38 +773,19 @@ def drawPlot(rank: int,
     imagePlots: List[go.Figure] = list()
 
     setupPlotLayout(rankName, config, figureList, htmlPlots, imagePlots, rank)
+    pyramid = (getPyramidDir(config.resultsDir, rank), config.zoomPyramidPoints) if config.genHTML and config.zoomPyramid else None
     if len(ranksCursor) > 0:
         dfCursorsList = setupCursorDataFrame(ranksCursor)
     for result in resultList:
         print(f'Processing: {result.fullpath}')
-        if result.typ == ResultType.RMS:
-            resultData = pd.read_csv(result.fullpath, sep=';', decimal=',', header=[0, 1])  # type: ignore
-        elif result.typ == ResultType.EMT_INF:
-            resultData = loadEMT(result.fullpath)
-        elif result.typ == ResultType.EMT_PSOUT:
-            signalPathNames = getUniqueEmtSignals(figureList)                                                                       # Make sure there are no duplicate signals
-            # Use the first signal, i.e. 'MTB\\mtb_s_pavail_pu' to find the location of the MTB instances (just to check if the MTB is not maybe placed on a different canvas than 'Main')
-            mtbPaths = findPsoutSignalPath(result.fullpath, signalPathNames[0])
-            if mtbPaths is None:
-                print('ERROR: MTB not found!')
-                sys.exit(0)
-            else:                
-                mtbPath = mtbPaths[0]                                                                                               # There should one be one instance                                        
-            if mtbPath != 'MTB':
-                signalPathNames = [s.replace('MTB\\', mtbPath + '\\', 1) if s.startswith('MTB\\') else s for s in signalPathNames]  # Replace the relative path 'MTB\\' with the correct signal path with respect to 'Root/Main/' for all MTB signal, if necessary
-            resultData = getPsoutSignals(result.fullpath, signalPathNames)                                                          # Get all the signals in the .psout file as a Pandas DataFrame
-            prefix_to_remove = mtbPath.replace('MTB', '', 1)
-            if prefix_to_remove != '\\':
-                resultData.columns = [col.removeprefix(prefix_to_remove) if 'MTB\\' in col else col for col in resultData.columns]  # Remove the path in front of all 'MTB\\signalName' columns in the DataFrame to reduce the legend lenght in the plots
-        elif result.typ == ResultType.EMT_CSV or result.typ == ResultType.EMT_ZIP:
-            resultData = pd.read_csv(result.fullpath, sep=';', decimal=',')  # type: ignore
-        else:
+        if config.streaming:
+            streamResult(result, figureList, ranksCursor, dfCursorsList if len(ranksCursor) > 0 else [], htmlPlots, imagePlots, colorMap, settingsDict, caseDf, config, pyramid)
+            continue
+        resultData = loadResultData(result, figureList, config, ranksCursor)
+        if resultData is None:
             continue
 
-        if config.genHTML:
-            addResults(htmlPlots, result, resultData, figureList, colorMap, config.htmlColumns, settingsDict, caseDf, config.genGuide)
-        if config.genImage:
-            addResults(imagePlots, result, resultData, figureList, colorMap,config.imageColumns, settingsDict, caseDf, config.genGuide)
+        addResults(outputPlotSets(htmlPlots, imagePlots, config), result, resultData, figureList, colorMap, settingsDict, caseDf, config.genGuide, plotPixelWidth(config), pyramid)
         if len(ranksCursor) > 0:
             addCursorMetrics(ranksCursor, dfCursorsList, result, resultData, settingsDict,  caseDf)
     
@@ -543,8 +801,6 @@ def drawPlot(rank: int,
         print(f'Exported plot for Rank {rank} to {figurePath}.{config.imageFormat}')
 
     if config.genCursorPDF and len(goCursorList)>0:
-        from pypdf import PdfWriter
-
         cursorPath = figurePath+'_cursor'
         genCursorPDF(goCursorList, rank, rankName, cursorPath)
         print(f'Exported cursors for Rank {rank} to {cursorPath}.pdf')
@@ -552,6 +808,36 @@ def drawPlot(rank: int,
     print(f'Plot for Rank {rank} done.')
 
 
+# Read-only context shared by all plot tasks. Set once per worker process by initWorker, so that only the rank and its results are sent with each task.
+_workerContext: Dict = dict()
+
+
+def initWorker(rankList: List[int],
+               figureDict: Dict[int, List[Figure]],
+               casesDf, # Pandas DataFrame
+               colorMap: Dict[str, List[str]],
+               cursorDict: List[Cursor],
+               settingsDict: Dict[str, str],
+               rankNameDict: Dict[int, str],
+               config: ReadConfig) -> None:
+    '''
+    Stores the read-only context shared by all plot tasks in the (worker) process.
+    '''
+    _workerContext.update(rankList=rankList, figureDict=figureDict, casesDf=casesDf, colorMap=colorMap, cursorDict=cursorDict,
+                          settingsDict=settingsDict, rankNameDict=rankNameDict, config=config)
+    if config.genImage or config.genCursorPDF:
+        startRenderer()
+
+
+def drawPlotTask(rank: int, resultList: List[Result]) -> float:
+    '''
+    Draws the plots for a single rank using the context stored by initWorker. Returns the time spent on the task in seconds.
+    '''
+    taskStart = time.time()
+    drawPlot(rank, resultList, **_workerContext)
+    return time.time() - taskStart
+
+
 def create_image_plots(config, figureList, figurePath, imagePlots):
     if config.imageColumns == 1:
         # Combine all figures into a single plot, same as for nColumns > 1 but no grid needed
@@ -574,10 +860,9 @@ def create_image_plots(config, figureList, figurePath, imagePlots):
         )
 
         # Save the combined plot as a single image
-        combined_plot.write_image(f'{figurePath}.{config.imageFormat}',
-                                  height=500 * len(imagePlots),
-                                  width=2000,
-                                  engine="kaleido")
+        exportImage(combined_plot, f'{figurePath}.{config.imageFormat}', config.imageFormat,
+                    height=500 * len(imagePlots),
+                    width=2000)
 
     else:
         # Combine all figures into a grid when nColumns > 1
@@ -586,10 +871,9 @@ def create_image_plots(config, figureList, figurePath, imagePlots):
             width=700 * config.imageColumns,  # Adjust width based on column number
             showlegend=True,
         )
-        imagePlots[0].write_image(f'{figurePath}.{config.imageFormat}',
-                                  height=500 * ceil(len(figureList) / config.imageColumns),
-                                  width=700 * config.imageColumns,
-                                  engine="kaleido" )  # type: ignore
+        exportImage(imagePlots[0], f'{figurePath}.{config.imageFormat}', config.imageFormat,
+                    height=500 * ceil(len(figureList) / config.imageColumns),
+                    width=700 * config.imageColumns)
 
 
 def setupPlotLayout(rankName, config, figureList, htmlPlots, imagePlots, rank):
@@ -721,8 +1005,8 @@ def create_html(plots: List[go.Figure], goCursorList: List[go.Figure], path: str
 
     source_list += '</div>'
 
-    html_content = create_html_plots(config.htmlColumns, plots, rank, rankName)
-    html_content_cursors = genCursorHTML(config.htmlCursorColumns, goCursorList, rank, rankName) if len(goCursorList) > 0 and config.genCursorHTML else ''
+    html_content = create_html_plots(config.htmlColumns, plots, rank, rankName, config.htmlAssets)
+    html_content_cursors = genCursorHTML(config.htmlCursorColumns, goCursorList, rank, rankName, config.htmlAssets) if len(goCursorList) > 0 and config.genCursorHTML else ''
     
     # Create Dropdown Content for the Navbar
     idx = 0
@@ -737,11 +1021,30 @@ def create_html(plots: List[go.Figure], goCursorList: List[go.Figure], path: str
     rankPrev = rankList[idx-1]
     rankNext = rankList[idx+1 if idx+1 < len(rankList) else 0]
     
+    pyramid_script = f'\n    <script src="{PYRAMID_JS}"></script>' if config.zoomPyramid else ''
+
+    # Use the shared local plotly.js and figure loader, or plotly.js from the CDN included by each figure
+    # The local pages do not load font-awesome from the CDN, i.e. the dropdown caret of the navbar is a unicode character
+    if config.htmlAssets == 'local':
+        plotly_script = f'\n    <script src="{PLOTLY_JS}"></script>'
+        template_block = f'\n    <script type="application/json" id="mtb-template">{to_json_plotly(sharedTemplate())}</script>'
+        loader_script = f'\n    <script src="{FIGURES_JS}"></script>'
+        mathjax_src = config.mathjaxPath
+        font_awesome_link = ''
+        caret = '&#9662;'
+    else:
+        plotly_script = template_block = loader_script = ''
+        mathjax_src = MATHJAX_CDN
+        font_awesome_link = f'\n\t<link rel="stylesheet" href="{FONT_AWESOME_CDN}">'
+        caret = '<i class="fa fa-caret-down"></i>'
+    mathjax_script = f'''<script type="text/javascript" id="MathJax-script" async
+      src="{mathjax_src}">
+    </script>''' if mathjax_src else ''
+
     full_html_content = f'''<html>
   <head>
-    <meta name="viewport" content="width=device-width, initial-scale=1" charset="utf-8">
-	<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/4.7.0/css/font-awesome.min.css">
-    <link rel="stylesheet" href="mtb.css"    
+    <meta name="viewport" content="width=device-width, initial-scale=1" charset="utf-8">{font_awesome_link}
+    <link rel="stylesheet" href="mtb.css">{plotly_script}{pyramid_script}
   </head>
   <body>
 	<div class="navbar">
@@ -749,7 +1052,7 @@ def create_html(plots: List[go.Figure], goCursorList: List[go.Figure], path: str
 	  <a href="{rankNext}.html" > Next Rank &raquo;</a>
 	  <div class="dropdown">
 		<button class="dropbtn">More Ranks
-		  <i class="fa fa-caret-down"></i>
+		  {caret}
 		</button>
 		<div class="dropdown-content">
           {dropdown_content}
@@ -775,9 +1078,7 @@ def create_html(plots: List[go.Figure], goCursorList: List[go.Figure], path: str
                     }}
                 }});
     </script>
-    <script type="text/javascript" id="MathJax-script" async
-      src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-chtml.js">
-    </script>
+    {mathjax_script}
     <script>
     MathJax = {{
       tex: {{
@@ -794,7 +1095,7 @@ def create_html(plots: List[go.Figure], goCursorList: List[go.Figure], path: str
     <br>
     {html_content}
     {html_content_cursors}
-    {source_list}
+    {source_list}{template_block}{loader_script}
     <p><center><a href="https://github.com/Energinet-AIG/MTB" target="_blank">Generated with Energinet's Model Testbench (MTB)</a></center></p>
   </body>
 </html>'''
@@ -803,7 +1104,62 @@ def create_html(plots: List[go.Figure], goCursorList: List[go.Figure], path: str
         file.write(full_html_content)
 
 
-def create_html_plots(columns, plots, rank, rankName):
+def sharedTemplate() -> Dict:
+    '''
+    Returns the default Plotly template of the figures, which is shared by all the figures of a page with htmlAssets = local.
+    '''
+    return pio.templates[pio.templates.default].to_plotly_json()
+
+
+def figureToHtml(fig: go.Figure, divId: str, plotConfig: Dict, htmlAssets: str) -> str:
+    '''
+    Returns the html of the Plotly figure. With htmlAssets = cdn, each figure includes the plotly.js and MathJax script tags from the CDN.
+    With htmlAssets = local, the figure is a compact JSON data block (without the shared template) rendered by the shared figure loader.
+    '''
+    if htmlAssets == 'cdn':
+        return fig.to_html(full_html=False,
+                           include_plotlyjs='cdn',
+                           include_mathjax='cdn',
+                           default_width='100%',
+                           config=plotConfig)
+
+    figureDict = fig.to_plotly_json()
+    layout = dict(figureDict['layout'])
+    if layout.get('template') == sharedTemplate():
+        del layout['template']                                                                                                      # The shared template is added by the loader
+    figureJson = to_json_plotly({'data': figureDict['data'], 'layout': layout, 'config': plotConfig}).replace('</', '<\\/')
+    return (f'<div id="{divId}" class="plotly-graph-div" style="width:100%;"></div>'
+            f'<script type="application/json" class="mtb-figure" data-div="{divId}">{figureJson}</script>')
+
+
+def create_html_assets(resultsDir: str) -> None:
+    '''
+    Writes the plotly.js bundle and the figure loader once to the results folder, used by all the html pages with htmlAssets = local.
+    The pages then open without internet access, as they do not use font-awesome and MathJax is only loaded from mathjaxPath.
+    '''
+    with open(join(resultsDir, PLOTLY_JS), 'w', encoding='utf-8') as file:
+        file.write(get_plotlyjs())
+
+    js_content = r'''// Renders the figure JSON data blocks of the page, see plotter.figureToHtml
+(function () {
+  if (typeof Plotly === 'undefined') {
+    console.error('mtb_figures.js: plotly.js is not loaded, check that plotly.min.js is next to the html page and included in its <head>');
+    return;
+  }
+  var templateBlock = document.getElementById('mtb-template');
+  var template = templateBlock ? JSON.parse(templateBlock.textContent) : undefined;
+  document.querySelectorAll('script.mtb-figure').forEach(function (block) {
+    var figure = JSON.parse(block.textContent);
+    if (template && !figure.layout.template) figure.layout.template = template;
+    Plotly.newPlot(block.getAttribute('data-div'), figure.data, figure.layout, figure.config);
+  });
+})();
+'''
+    with open(join(resultsDir, FIGURES_JS), 'w') as file:
+        file.write(js_content)
+
+
+def create_html_plots(columns, plots, rank, rankName, htmlAssets='cdn'):
     if columns in (1,2,3):
         figur_links = '<div style="text-align: left; margin-top: 1px;">'
         figur_links += '<h2><div id="Figures">Figures:</div></h2><br>'
@@ -837,11 +1193,7 @@ def create_html_plots(columns, plots, rank, rankName):
                        'displaylogo': True    # Optional: Hide Plotly logo for this plot
                        # Add any other plot-specific config options here
                       }
-        plot_html = plot.to_html(full_html=False,
-                                 include_plotlyjs='cdn',
-                                 include_mathjax='cdn',
-                                 default_width='100%',
-                                 config=plot_config)
+        plot_html = figureToHtml(plot, f'Plot-{i}', plot_config, htmlAssets)
         html_content += f'<td><div id="{plot_ref}">' + plot_html + '</div></td>'  # type: ignore
         if ((i+1) % columns) == 0:
             html_content += '</tr>'
@@ -850,9 +1202,68 @@ def create_html_plots(columns, plots, rank, rankName):
     return html_content
 
 
+def watchResults(watchDir: str,
+                 taskIdCsv: Union[str, None],
+                 resultDict: Dict[int, List[Result]],
+                 figureDict: Dict[int, List[Figure]],
+                 casesDf, # Pandas DataFrame
+                 cursorDict: List[Cursor],
+                 settingsDict: Dict[str, str],
+                 rankNameDict: Dict[int, str],
+                 config: ReadConfig) -> None:
+    '''
+    Plots each rank as soon as one of its result files in watchDir is complete, together with the results of the rank in the
+    configured simulation data folders. A rank is plotted again when another result file of the rank completes later.
+    '''
+    group = next((name for name, path in config.simDataDirs if abspath(path) == abspath(watchDir)), 'EMT')
+    watcher = ResultWatcher(watchDir, group, idFile, readTaskIdRanks(taskIdCsv) if taskIdCsv else None)
+    for rank in list(resultDict.keys()):
+        resultDict[rank] = [result for result in resultDict[rank] if dirname(abspath(result.fullpath)) != watcher.watchDir]  # Found by the watcher
+
+    if config.genImage or config.genCursorPDF:
+        startRenderer()
+
+    print(f'Watching {watchDir} for completed result files. Press Ctrl+C to stop.')
+    try:
+        while True:
+            readyRanks: Set[int] = set()
+            for result in watcher.poll():
+                print(f'Result file completed: {result.fullpath}')
+                resultDict.setdefault(result.rank, []).append(result)
+                readyRanks.add(result.rank)
+
+            if len(readyRanks) > 0:
+                rankList = sorted(set(rankNameDict.keys()) | set(resultDict.keys()))   # Include the ranks still simulating in the navbar
+                colorSchemeMap = colorMap(resultDict)
+                for rank in sorted(readyRanks):
+                    try:
+                        drawPlot(rank, resultDict[rank], rankList, figureDict, casesDf, colorSchemeMap, cursorDict, settingsDict, rankNameDict, config)
+                    except Exception as e:
+                        print(f'Plot for Rank {rank} failed with error: {e}')
+            time.sleep(WATCH_INTERVAL)
+    except KeyboardInterrupt:
+        print('Stopped watching.')
+
+
+def parseArguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Plots the simulation results from PSCAD and PowerFactory as configured in config.ini')
+    parser.add_argument('--image-only', action='store_true',
+                        help='Only export the images (and the cursor PDF if genCursorPDF is True), e.g. to re-export the images without regenerating the html pages')
+    parser.add_argument('--watch', metavar='DIR',
+                        help='Watch the folder (e.g. the PSCAD build folder) and plot each rank as soon as its result files are complete')
+    parser.add_argument('--task-ids', metavar='CSV',
+                        help='With --watch, the caseRankTaskID.csv mapping the task IDs in the result file names to the ranks, e.g. ..\\caseRankTaskID.csv for the PSCAD build folder')
+    return parser.parse_args()
+
+
 def main() -> None:
     start_time = time.time()
+    args = parseArguments()
     config = ReadConfig()
+    if args.image_only:
+        config.genHTML = False
+        config.genCursorHTML = False
+        config.genImage = True
 
     print('Starting plotter Main Process')
 
@@ -884,27 +1295,74 @@ def main() -> None:
         makedirs(config.resultsDir)
 
     create_css(config.resultsDir)
+    if config.htmlAssets == 'local':
+        create_html_assets(config.resultsDir)
+    if config.zoomPyramid:
+        create_pyramid_js(config.resultsDir)
+
+    if args.watch:
+        watchResults(args.watch, args.task_ids, resultDict, figureDict, casesDf, cursorDict, settingsDict, rankNameDict, config)
+        return
         
-    tasks = [
-        (rank, resultDict, figureDict, casesDf, colorSchemeMap, cursorDict, settingsDict, rankNameDict, config)
-        for rank in resultDict.keys()
-        ]
-
-    if config.processes > 1:
-        with ProcessPoolExecutor(max_workers=config.processes) as executor:
-            futures = [executor.submit(drawPlot, *task) for task in tasks]
-            
-            for future in tqdm(as_completed(futures), 
-                               total=len(futures), 
-                               desc="Plotting Ranks",
-                               ncols=None):
+    rankList = sorted(resultDict.keys())
+    workerContext = (rankList, figureDict, casesDf, colorSchemeMap, cursorDict, settingsDict, rankNameDict, config)
+    tasks = [(rank, resultDict[rank]) for rank in resultDict.keys()]
+
+    # Submit the most expensive ranks first, the workers pull the tasks from the pool's shared queue in that order
+    costs = {rank: estimateRankCost(resultDict[rank],
+                                    figureDict.get(rank, figureDict.get(-1, [])),
+                                    [i for i in cursorDict if i.id == rankNameDict.get(rank, [])],
+                                    config)
+             for rank in resultDict.keys()}
+    tasks = orderTasksByCost(tasks, costs)
+
+    # Only plot the ranks whose inputs or configuration changed since the previous run
+    if config.incremental:
+        manifest = readManifest(config.resultsDir, __version__)
+        fingerprints: Dict[int, str] = dict()
+        staleTasks = list()
+        for task in tasks:
+            rank = task[0]
+            ranksCursor = [i for i in cursorDict if i.id == rankNameDict.get(rank, [])]
+            fingerprints[rank] = rankFingerprint(manifest, resultDict[rank], figureDict.get(rank, figureDict.get(-1, [])), ranksCursor,
+                                                 casesDf[casesDf['Case']['Rank']==rank], settingsDict, colorSchemeMap, rankList, rankNameDict, config)
+            if isRankStale(manifest, rank, fingerprints[rank], rankOutputs(rank, len(ranksCursor) > 0, config), config.resultsDir):
+                staleTasks.append(task)
+                manifest['ranks'].pop(str(rank), None)                                                                              # Not up to date until plotted, also if the run is interrupted
+        print(f'Incremental run: plotting {len(staleTasks)} of {len(tasks)} rank(s), the other ranks are unchanged')
+        tasks = staleTasks
+        for rank in list(manifest['ranks'].keys()):
+            if int(rank) not in resultDict:
+                del manifest['ranks'][rank]
+        writeManifest(config.resultsDir, manifest)
+
+    # Size the number of workers to the CPU cores and the available memory, and only start a rank when its estimated memory fits
+    memory = {rank: estimateRankMemory(resultDict[rank], config) for rank in resultDict.keys()}
+    budget = memoryBudget()
+    workers = resolveWorkers(config.processes, memory, budget)
+    print(f'Using {workers} process(es), memory budget {budget/1e9:.1f} GB, largest estimated rank peak memory {max(memory.values(), default=0)/1e9:.2f} GB')
+
+    taskTimes: List[float] = list()
+    plotStart = time.time()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initWorker, initargs=workerContext) as executor:
+            for task, future in tqdm(scheduleTasks(executor, drawPlotTask, tasks, memory, budget, workers),
+                                     total=len(tasks), 
+                                     desc="Plotting Ranks",
+                                     ncols=None):
                 try:
-                    future.result() # This will raise the actual error if a process crashed
+                    taskTimes.append(future.result()) # This will raise the actual error if a process crashed
+                    if config.incremental:
+                        markRankPlotted(config.resultsDir, manifest, task[0], fingerprints[task[0]])
                 except Exception as e:
-                    tqdm.write(f"Task failed with error: {e}")
+                    tqdm.write(f"Task for Rank {task[0]} failed with error: {e}")
     else:
+        initWorker(*workerContext)
         for task in tasks:
-            drawPlot(*task)
+            taskTimes.append(drawPlotTask(*task))
+            if config.incremental:
+                markRankPlotted(config.resultsDir, manifest, task[0], fingerprints[task[0]])
+    print(parallelEfficiency(taskTimes, time.time() - plotStart, min(workers, max(len(tasks), 1))))
            
     end_time = time.time()
     elapsed_time = end_time - start_time
@@ -67,75 +67,82 @@ def findPsoutSignalPath(psoutFilePath: str, signalPathName: str, sourceType: str
         results = search_node(root)
         return results if results else None
        
-def getPsoutSignal(psoutFilePath, signalPathName):
+def resolvePsoutCalls(psoutFile, signalPathNames):
     '''
-    Get time and trace/signal from the opened psout file
+    Resolve the trace calls of all the signals in signalPathNames in the already opened psout file.
+    Returns a list of (signalPathName, calls) tuples in the same order as signalPathNames,
+    where calls is None if the signal could not be found.
     '''
-    data_path = 'Root\\Main\\'+ signalPathName +'\\0'       # figureSetup.csv uses '\\' to be consistend with PowerFactory (and MHI's Enerplot)
-    data_path = data_path.replace('\\', '/')                # But mhi.psout want to use '/'
-    
-    with mhi.psout.File(psoutFilePath) as psoutFile:
+    resolvedCalls = list()
+    for signalPathName in signalPathNames:
+        data_path = 'Root\\Main\\'+ signalPathName +'\\0'   # figureSetup.csv uses '\\' to be consistend with PowerFactory (and MHI's Enerplot)
+        data_path = data_path.replace('\\', '/')            # But mhi.psout want to use '/'
         try:
-            data = psoutFile.call(data_path)
+            calls = list(psoutFile.call(data_path).calls())
         except:
-            print(f'The signal data path, {data_path} could not be found in {psoutFilePath}!')
-            return None, None
-            
-        run = psoutFile.run(0)
-        signal = list()
-        for call in data.calls():
-            trace = run.trace(call)
-            time = trace.domain.data
-            signal.append(trace.data)
+            calls = None
+        resolvedCalls.append((signalPathName, calls))
 
-    return time, signal
+    return resolvedCalls
 
 
-def getPsoutSignals(psoutFilePath, signalPathNames):
+def readPsoutSignals(psoutFilePath, signalPathNames, dtype=np.float64):
     '''
-    Get all signals from the .psout file whose names appear in the signalPathNames list
-    Exit if the first signal (time refrence) is missing.
+    Read all signals from the .psout file whose names appear in the signalPathNames list
+    The .psout file is opened once and read in two phases:
+        1. Sizing: all the signal paths are resolved and the time axis is read once (from the first signal)
+           to determine the number of columns (including the signal array widths) and samples
+        2. Filling: every trace is written directly into one preallocated (signals x samples) buffer of the
+           given dtype (np.float64 or np.float32)
+    The time axis is always kept as float64 to preserve the time resolution of small time steps.
+    Returns the time axis, the column names of the signals and the signal buffer.
+    Raise a ValueError if the first signal (time refrence) is missing.
     Missing signals are ignored.
+    '''
+    with mhi.psout.File(psoutFilePath) as psoutFile:
+        # Phase 1: Size the result
+        resolvedCalls = resolvePsoutCalls(psoutFile, signalPathNames)
+
+        if not resolvedCalls[0][1]:
+            raise ValueError(f"Primary signal '{signalPathNames[0]}' (Time) not found in {psoutFilePath}. Cannot proceed.")
+
+        run = psoutFile.run(0)
+        t = np.asarray(run.trace(resolvedCalls[0][1][0]).domain.data, dtype=np.float64)   # Get time values to get the length of all the signals in the .psout file
+
+        columnNames = list()                                            # Column names of the signals, i.e. the rows of the buffer
+        signalCalls = list()
+        for signalPathName, calls in resolvedCalls:
+            if not calls:
+                print(f'The signal data path, {signalPathName} could not be found in {psoutFilePath}!')
+                print(f"Warning: Signal '{signalPathName}' not found. Skipping...")
+                continue
+
+            # Test for signal array and convert signal name to a set of signal names for each signal in the array
+            if len(calls) > 1:
+                columnNames.extend([f'{signalPathName}_{i+1}' for i in range(len(calls))])
+            else:
+                columnNames.append(signalPathName)
+            signalCalls.extend(calls)
+
+        # Phase 2: Fill the preallocated buffer, one contiguous row per signal
+        psoutSignals = np.empty((len(signalCalls), len(t)), dtype=dtype)
+        for row, call in enumerate(signalCalls):
+            psoutSignals[row, :] = run.trace(call).data
+
+    return t, columnNames, psoutSignals
+
+
+def getPsoutSignals(psoutFilePath, signalPathNames, dtype=np.float64):
+    '''
+    Get all signals from the .psout file whose names appear in the signalPathNames list as a DataFrame, see readPsoutSignals.
+    The signal buffer is wrapped in the returned DataFrame without copying.
     '''    
     
     if not signalPathNames:                                             # Return an empy DataFrame is the signalPathNames list is empy.
         return pd.DataFrame()
-    
-    t, _ = getPsoutSignal(psoutFilePath, signalPathNames[0])            # Get time values to get the length of all the signals in the .psout file
-
-    if t is None:
-            print(f"CRITICAL: Primary signal '{signalPathNames[0]}' (Time) not found. Cannot proceed.")
-            sys.exit(1)
 
-    t = np.array(t)                                                     # Convert to a numpy array
-    t = t.reshape(1,-1)                                                 # Reshape the t from (N,) to (1,N)
-    psoutSignals = np.array(t)                                          # Use as first row for the signals array
-    
-    columnNames = signalPathNames.copy()                                # Column names to be used for the returned DataFrame
-    idxOffset = 0                                                       # To keep track of the columnnames size as signals are converter to signal arrays
-    
-    for signalPathName in signalPathNames:
-        _, psoutSignal = getPsoutSignal(psoutFilePath, signalPathName)  # Try to get each signal in the signalnames list
-
-        if psoutSignal is None:
-            print(f"Warning: Signal '{signalPathName}' not found. Skipping...")
-            columnNames.remove(signalPathName)                          # Remove the signal name
-            continue        
-                
-        psoutSignal = np.array(psoutSignal)                             # Convert to numpy array
-
-        # Test for signal array and convert signal name to a set of signal names for each signal in the array
-        signalRows = psoutSignal.shape[0]
-        if  signalRows > 1:
-            idx = signalPathName.index(signalPathName)
-            columnNames.remove(signalPathName)                          # Remove the signal name
-            for i in range(signalRows):                                 # And replace it with signal array names
-                columnNames.insert(idxOffset+idx+i,f'{signalPathName}_{i+1}')
-                
-            idxOffset = idxOffset + signalRows-1                        # Add the offset due to the signal array, to the column name index
-            
-        psoutSignals = np.append(psoutSignals, psoutSignal, axis=0)     # Append to the signals array containing the time
-        
-    columnNames = ['time']+columnNames                                  # Add the lable to be used for the time column
+    t, columnNames, psoutSignals = readPsoutSignals(psoutFilePath, signalPathNames, dtype)
+    resultData = pd.DataFrame(psoutSignals.T, columns=columnNames, copy=False)   # The transpose is a view, i.e. no copy of the buffer
+    resultData.insert(0, 'time', t)                                             # Add the time column in front without consolidating the signal buffer
     
-    return pd.DataFrame(np.transpose(psoutSignals), columns=columnNames)
+    return resultData
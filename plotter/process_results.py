@@ -19,7 +19,7 @@ def getColNames(rawSigName, result):
         # uses only the signal name - last part of the hierarchical signal name
         rawSigName = rawSigName.split('\\')[-1]
         sigColName = rawSigName
-    elif result.typ == ResultType.EMT_PSOUT:
+    elif result.typ in (ResultType.EMT_PSOUT, ResultType.EMT_COLUMNAR):
         # uses the full hierarchical signal name
         sigColName = rawSigName
     else:
@@ -2,18 +2,24 @@
 '''
 This is a script to convert Manitoba Hydro International (MHI) PSOUT files to CSV format.
 It reads the PSOUT files from a specified folder, extracts the required signals based on a figure setup CSV file, and writes the data to CSV files. 
-It supports optional compression of the output files, i.e. .zip, .gz, .bz2, or .xz formats provided by Pandas' "to_csv" function.
+It supports optional compression of the output files, i.e. .zip, .gz, .bz2, or .xz formats. The rows are formatted and written in bounded blocks
+straight from the signal buffer, i.e. the formatted text of a whole file is never held in memory.
+Alternatively the signals can be written to binary columnar files, i.e. .parquet (zstd), .feather (zstd) or compressed .npz, which are
+bit-exact, smaller and read by the plotter without any text parsing.
 It is designed to be used in conjunction with the process_psout set of function and uses Manitoba Hydro International (MHI) PSOUT File Reader Library.
-It is designed to be run from the command line with various options for input and output paths, compression type, and verbosity.
+It is designed to be run from the command line with various options for input and output paths, compression type, number of worker processes and verbosity.
 '''
-import os, glob, time
+import os, glob, time, io, gzip, bz2, lzma, zipfile
+from contextlib import contextmanager
 from datetime import datetime
-from process_psout import getPsoutSignals
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from process_psout import getPsoutSignals, readPsoutSignals
+from result_cache import writeColumnarResult
 import argparse
 import numpy as np
 import pandas as pd
 
-__version__ = 2.0
+__version__ = 2.1
 
 #-----------------------------------------------------------------------------#
 parser = argparse.ArgumentParser(prog = 'psout_to_csv',
@@ -46,7 +52,16 @@ parser.add_argument('-c', '--compressionType',
                     nargs = '?',          
                     metavar = 'COMPRESSIONTYPE',
                     default = '.csv',
-                    help = 'the output compression type e.g. .zip, .bx2, .gz or .xz')
+                    help = 'the output compression type e.g. .zip, .bx2, .gz or .xz, or the binary output type .parquet, .feather or .npz')
+parser.add_argument('-w', '--workers',
+                    action = 'store',
+                    dest = 'workers',
+                    type = int,
+                    nargs = '?',
+                    const = 0,
+                    metavar = 'WORKERS',
+                    default = 1,
+                    help = 'the number of .psout files to convert concurrently, 0 (or -w without a number) uses all available CPU cores')
 parser.add_argument('-q', '--quiet',
                     action = 'store_true',
                     dest = 'QUIET',
@@ -59,6 +74,10 @@ parser.add_argument('-v','--version',
 args = parser.parse_args()
 #-----------------------------------------------------------------------------#
 
+CHUNK_CELLS = 1000000   # Number of values (rows x columns) formatted and written to the .csv file at a time
+TEXT_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+BINARY_TYPES = ('.parquet', '.feather', '.npz')
+
 def getAllSignalnames(figureSetupPath):
     '''
     Get all the EMT signal names required from figureSetup.csv for the figures in the HTML and PNG plotter output
@@ -95,21 +114,101 @@ def getCaseSignalnames(emtSignalnamesDF, case):
     return signalnames
 
 
-def convertPsouts(psoutFolder, csvFolder, outFileType, lstSignalnames):
+@contextmanager
+def openTextOutput(outFilePath):
+    '''
+    Open the text output file for writing, compressed as inferred from the file extension (.zip, .gz, .bz2 or .xz) like Pandas' "to_csv".
+    '''
+    ext = os.path.splitext(outFilePath)[1].lower()
+    if ext == '.zip':
+        with zipfile.ZipFile(outFilePath, 'w', zipfile.ZIP_DEFLATED) as archive:
+            with archive.open(os.path.basename(outFilePath)[:-len(ext)], 'w', force_zip64=True) as member:    # The archive member is named as by Pandas
+                with io.TextIOWrapper(member, encoding='utf-8', newline='') as file:
+                    yield file
+    elif ext in TEXT_OPENERS:
+        with TEXT_OPENERS[ext](outFilePath, 'wt', encoding='utf-8', newline='') as file:
+            yield file
+    else:
+        with open(outFilePath, 'w', encoding='utf-8', newline='') as file:
+            yield file
+
+
+def writeCsvBlocks(outFilePath, t, columnNames, psoutSignals):
+    '''
+    Write the time axis and the signal buffer (signals x samples) to the (optionally compressed) .csv file.
+    The rows are formatted and written in blocks of about CHUNK_CELLS values, i.e. only one block is held as a DataFrame and text at a time.
+    '''
+    blockRows = max(1, CHUNK_CELLS // (len(columnNames) + 1))
+    with openTextOutput(outFilePath) as file:
+        for start in range(0, max(len(t), 1), blockRows):
+            block = pd.DataFrame(psoutSignals[:, start:start + blockRows].T, columns=columnNames, copy=False)
+            block.insert(0, 'time', t[start:start + blockRows])
+            block.to_csv(file, sep=';', header=start == 0, index=False, decimal=',') #Note: For a Danish computer, decimal=',' else numbers are read in incorrelty in Excel
+
+
+def convertPsout(psoutFilePath, csvFolder, outFileType, signalnames, quiet=False):
+    '''
+    Convert a single .psout file. For the binary output types the signals are loaded as a DataFrame and written as columns,
+    otherwise the signals are read into one buffer and written in blocks of rows by writeCsvBlocks, i.e. no DataFrame of the whole file is built.
+    Returns the input and output file sizes in bytes.
+    '''
+    psoutFileNameExt = os.path.basename(psoutFilePath)
+    psoutFileName = os.path.splitext(psoutFileNameExt)[0]
+    projectname, case = psoutFileName.split('_')
+    case = int(case)
+    if not quiet: print(f'Processing {psoutFileNameExt}')
+    outFilePath = os.path.join(csvFolder, f'{projectname}_{case:02}{outFileType}')
+    if outFileType.lower() in BINARY_TYPES:
+        dfSignals = getPsoutSignals(psoutFilePath, signalnames)
+        if not quiet: print(f'Writing {projectname}_{case:02}{outFileType}\n')
+        writeColumnarResult(outFilePath, dfSignals)
+    else:
+        t, columnNames, psoutSignals = readPsoutSignals(psoutFilePath, signalnames)
+        if not quiet: print(f'Writing {projectname}_{case:02}{outFileType}\n')
+        writeCsvBlocks(outFilePath, t, columnNames, psoutSignals)
+    return os.path.getsize(psoutFilePath), os.path.getsize(outFilePath)
+
+
+def convertPsouts(psoutFolder, csvFolder, outFileType, lstSignalnames, workers=1):
+    '''
+    Convert all the .psout files in psoutFolder, using a pool of worker processes if workers > 1.
+    Returns the number of converted files and the total input and output sizes in bytes.
+    '''
     psoutFilesPath = glob.glob(os.path.join(psoutFolder,'*.psout'))
     os.mkdir(csvFolder)
 
+    jobs = list()
     for psoutFilePath in psoutFilesPath:
-        psoutFileNameExt = os.path.basename(psoutFilePath)
-        psoutFileName = os.path.splitext(psoutFileNameExt)[0]
-        projectname, case = psoutFileName.split('_')
-        case = int(case)
-        if not args.QUIET: print(f'Processing {psoutFileNameExt}')
-        signalnames = getCaseSignalnames(lstSignalnames, case)
-        dfSignals = getPsoutSignals(psoutFilePath, signalnames)
-        dfSignals.set_index('time', inplace=True)
-        if not args.QUIET: print(f'Writing {projectname}_{case:02}{outFileType}\n')
-        dfSignals.to_csv(os.path.join(csvFolder, f'{projectname}_{case:02}{outFileType}'), sep=';', header=True, compression='infer', decimal=',') #Note: For a Danish computer, decimal=',' else numbers are read in incorrelty in Excel
+        case = int(os.path.splitext(os.path.basename(psoutFilePath))[0].split('_')[1])
+        jobs.append((psoutFilePath, csvFolder, outFileType, getCaseSignalnames(lstSignalnames, case), args.QUIET))
+
+    files, bytesIn, bytesOut = 0, 0, 0
+    for sizeIn, sizeOut in convertJobs(jobs, workers):
+        files, bytesIn, bytesOut = files + 1, bytesIn + sizeIn, bytesOut + sizeOut
+    return files, bytesIn, bytesOut
+
+
+def convertJobs(jobs, workers):
+    '''
+    Runs the convertPsout jobs, using a pool of worker processes if workers > 1, and yields the input and output file sizes of each converted file.
+    A file that fails to convert is reported and skipped, i.e. it does not abort the conversion of the other files.
+    '''
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(convertPsout, *job): job[0] for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    print(f'Failed to convert {futures[future]}: {e}')
+    else:
+        for job in jobs:
+            try:
+                sizes = convertPsout(*job)
+            except Exception as e:
+                print(f'Failed to convert {job[0]}: {e}')
+                continue
+            yield sizes
 
 
 def main():
@@ -117,10 +216,13 @@ def main():
     start = time.time()
     lstSignalnames = getAllSignalnames(args.figureSetupPath)    
     outputFolder = os.path.join(args.outputRootFolder, f'MTB_{datetime.now().strftime(r"%d%m%Y%H%M%S")}')
-    convertPsouts(args.psoutFolder, outputFolder, args.compressionType, lstSignalnames)
+    workers = args.workers if args.workers > 0 else os.cpu_count()
+    files, bytesIn, bytesOut = convertPsouts(args.psoutFolder, outputFolder, args.compressionType, lstSignalnames, workers)
     end = time.time()
     elapsed = end - start
     print(f'Done! ({elapsed:.2f} s)')
+    print(f'Converted {files} files using {workers} worker(s): {files/elapsed:.2f} files/s, '
+          f'{bytesIn/1e6/elapsed:.1f} MB/s read ({bytesIn/1e6:.1f} MB), {bytesOut/1e6/elapsed:.1f} MB/s written ({bytesOut/1e6:.1f} MB)')
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,31 +1,18 @@
+import csv
 import pandas as pd
 from os.path import join, split, splitext
 from os import listdir
-from typing import Dict
+from typing import Dict, List, Union
 import re
 
+RMS_ENCODING = 'utf-8'  # Encoding of the PowerFactory RMS csv exports, the default encoding of pd.read_csv
+
 
 def loadEMT(infFile: str) -> pd.DataFrame:
     '''
     Load EMT results from a collection of csv files defined by the given inf file. Returns a dataframe with index 'time'.
     '''
-    folder, filename = split(infFile)
-    filename, fileext = splitext(filename)
-
-    assert fileext.lower() == '.inf'
-
-    adjFiles = listdir(folder)
-    csvMap: Dict[int, str] = dict()
-    pat = re.compile(r'^' + filename.lower() + r'(?:_([0-9]+))?.csv$')
-
-    for file in adjFiles:
-        rem = re.match(pat, file.lower())
-        if rem:
-            if rem.group(1) is None:
-                id = -1
-            else:
-                id = int(rem.group(1))
-            csvMap[id] = join(folder, file)
+    csvMap = emtCsvFiles(infFile)
     csvMaps = list(csvMap.keys())
     csvMaps.sort()
 
@@ -50,6 +37,30 @@ def loadEMT(infFile: str) -> pd.DataFrame:
     return df
 
 
+def emtCsvFiles(infFile: str) -> Dict[int, str]:
+    '''
+    Finds the csv files belonging to the given inf file. Returns a dictionary with the csv file number as key (-1 if unnumbered) and the csv file path as value.
+    '''
+    folder, filename = split(infFile)
+    filename, fileext = splitext(filename)
+
+    assert fileext.lower() == '.inf'
+
+    adjFiles = listdir(folder)
+    csvMap: Dict[int, str] = dict()
+    pat = re.compile(r'^' + filename.lower() + r'(?:_([0-9]+))?.csv$')
+
+    for file in adjFiles:
+        rem = re.match(pat, file.lower())
+        if rem:
+            if rem.group(1) is None:
+                id = -1
+            else:
+                id = int(rem.group(1))
+            csvMap[id] = join(folder, file)
+    return csvMap
+
+
 def emtColumns(infFilePath: str) -> Dict[int, str]:
     '''
     Reads EMT result columns from the given inf file and returns a dictionary with the column number as key and the column name as value.
@@ -62,4 +73,24 @@ def emtColumns(infFilePath: str) -> Dict[int, str]:
                 line)
             if rem:
                 columns[int(rem.group(1))] = rem.group(2)
-    return columns
\ No newline at end of file
+    return columns
+
+
+def loadRMS(csvFile: str, columns: Union[List, None] = None) -> pd.DataFrame:
+    '''
+    Load RMS results from the PowerFactory ComRes csv export (see execute_pf.setupExport), i.e. ';' separated with decimal comma and a two row
+    (object, variable) header. Returns a dataframe with the header as column MultiIndex. If columns is given, only the given columns (and always
+    the first, i.e. time, column) are parsed. The header is read separately, so the values are parsed by the fast C parser without a header.
+    '''
+    with open(csvFile, 'r', newline='', encoding=RMS_ENCODING) as file:                                                             # Same encoding as the values parsed by read_csv
+        reader = csv.reader(file, delimiter=';')
+        header = list(zip(next(reader), next(reader)))
+
+    if any('' in name for name in header):
+        df = pd.read_csv(csvFile, sep=';', decimal=',', header=[0, 1], encoding=RMS_ENCODING)  # type: ignore                                              # Let Pandas name the unnamed columns
+        return df if columns is None else df[[df.columns[0]] + [col for col in df.columns[1:] if col in columns]]
+
+    usecols = list(range(len(header))) if columns is None else [0] + [i for i in range(1, len(header)) if header[i] in set(columns)]
+    df = pd.read_csv(csvFile, sep=';', decimal=',', header=None, skiprows=2, usecols=usecols, engine='c', encoding=RMS_ENCODING)  # type: ignore
+    df.columns = pd.MultiIndex.from_tuples([header[i] for i in usecols])
+    return df
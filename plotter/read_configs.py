@@ -28,7 +28,21 @@ class ReadConfig:
         assert self.htmlCursorColumns > 0 or not self.genHTML
         self.imageFormat = parsedConf['imageFormat']
         self.processes = parsedConf.getint('processes')
-        assert self.processes > 0
+        assert self.processes >= 0
+        self.psoutDtype = parsedConf.get('psoutDtype', 'float64')
+        assert self.psoutDtype in ('float64', 'float32')
+        self.resultCache = parsedConf.getboolean('resultCache', fallback=False)
+        self.cacheFormat = parsedConf.get('cacheFormat', 'npz')
+        assert self.cacheFormat in ('npz', 'mmap')
+        self.streaming = parsedConf.getboolean('streaming', fallback=False)
+        self.scanIndex = parsedConf.getboolean('scanIndex', fallback=False)
+        self.incremental = parsedConf.getboolean('incremental', fallback=False)
+        self.htmlAssets = parsedConf.get('htmlAssets', 'cdn')
+        assert self.htmlAssets in ('cdn', 'local')
+        self.mathjaxPath = parsedConf.get('mathjaxPath', '')
+        self.zoomPyramid = parsedConf.getboolean('zoomPyramid', fallback=False)
+        self.zoomPyramidPoints = parsedConf.getint('zoomPyramidPoints', fallback=262144)
+        assert self.zoomPyramidPoints > 0
         self.testcaseSheet = parsedConf['testcaseSheet']
         self.simDataDirs : List[Tuple[str, str]] = list()
         simPaths = cp.items('Simulation data paths')
@@ -39,6 +53,12 @@ class ReadConfig:
 def readFigureSetup(filePath: str) -> Dict[int, List[Figure]]:
     '''
     Read figure setup file.
+    The optional column gradient_decimation sets the ratio of the gradient downsampling, i.e. every gradient_decimation'th point where the
+    gradient is below gradient_threshold is kept. Leave it empty for the default of 20.
+    The optional column point_budget sets the max. number of points of each downsampled trace of the figure. With N > 0 the amount (MinMaxLTTB)
+    downsampling outputs N points and the gradient downsampling is reduced to at most N points. With auto the budget is chosen from the plot
+    width in pixels and the variability of the signal, see sampling_functions.auto_point_budget. Leave it empty (or 0) for the default, i.e. 100 points
+    for the amount downsampling and no bound for the gradient downsampling.
     '''
     setup: List[Dict[str, str | List[int]]] = list()
     with open(filePath, newline='') as setupFile:
@@ -65,7 +85,9 @@ def readFigureSetup(filePath: str) -> Dict[int, List[Figure]]:
                    figureStr['gradient_threshold'],  # type: ignore
                    DownSamplingMethod.from_string(figureStr['down_sampling_method']),  # type: ignore
                    figureStr['include_in_case'],  # type: ignore
-                   figureStr['exclude_in_case']))  # type: ignore
+                   figureStr['exclude_in_case'],  # type: ignore
+                   int(figureStr.get('gradient_decimation') or 20),  # type: ignore
+                   figureStr.get('point_budget') or 0))  # type: ignore
 
     # 1. Identify "Global" figures (those with no specific include list)
     global_figures = [fig for fig in figureList if not fig.include_in_case]
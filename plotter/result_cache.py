@@ -0,0 +1,257 @@
+'''
+A columnar on-disk cache for the signals extracted from the simulation result files.
+The extracted signals of a result file are stored in an uncompressed .npz file (one array per column)
+in a '.mtb_cache' folder beside the result file. The cache entry is keyed on the result file path, size
+and modification time (including the adjacent .csv files of .inf results), the requested signal set and the signal dtype,
+so the cache is automatically invalidated when the result file is overwritten or the figure setup or psoutDtype changes.
+Columns are loaded lazily, i.e. only the columns requested are read from the cache file.
+
+Alternatively the signals can be stored in a memory-mapped store, i.e. a '.mmap' folder holding one contiguous
+float32 file per signal and a small 'index.json' sidecar with the signal names, units and time base. The signals
+are returned as read-only memory-mapped arrays, so only the pages actually read are loaded and the worker
+processes share the OS page cache instead of each holding a private copy of the result data.
+
+The module also reads and writes the binary columnar result files (.parquet, .feather and .npz) produced by psout_to_csv.
+'''
+from __future__ import annotations
+import hashlib
+import json
+import shutil
+from glob import glob, escape
+from os import makedirs, remove, replace, stat
+from os.path import abspath, basename, dirname, exists, isdir, join, splitext
+from typing import Dict, List, Union
+import numpy as np
+import pandas as pd
+from Result import ResultType, Result
+from read_and_write_functions import emtCsvFiles
+
+CACHE_DIR = '.mtb_cache'
+COLUMNS_KEY = '__columns__'
+STORE_INDEX = 'index.json'
+CACHE_FORMATS = ('npz', 'mmap')
+
+
+def resultSourceFiles(result: Result) -> List[str]:
+    '''
+    Returns all the files the data of the given result is read from.
+    '''
+    if result.typ == ResultType.EMT_INF:
+        csvMap = emtCsvFiles(result.fullpath)
+        return [result.fullpath] + [csvMap[id] for id in sorted(csvMap.keys())]
+    return [result.fullpath]
+
+
+def getCachePath(result: Result, signals: Union[List[str], None] = None, cacheFormat: str = 'npz', dtype: str = 'float64') -> str:
+    '''
+    Returns the cache file (npz) or folder (mmap) path for the given result, requested signal set and signal dtype.
+    '''
+    assert cacheFormat in CACHE_FORMATS
+    key = list()
+    for file in resultSourceFiles(result):
+        fileStat = stat(file)
+        key.append([abspath(file), fileStat.st_size, fileStat.st_mtime_ns])
+    key.append(signals if signals is not None else [])
+    key.append(dtype)
+    digest = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()[:16]
+    return join(dirname(result.fullpath), CACHE_DIR, f'{basename(result.fullpath)}.{digest}.{cacheFormat}')
+
+
+def readResultCache(cachePath: str, columns: Union[List, None] = None) -> Union[pd.DataFrame, None]:
+    '''
+    Reads the cached result DataFrame. Only the given columns (and always the first, i.e. time, column) are loaded if columns is specified.
+    Returns None if there is no valid cache entry.
+    '''
+    if not exists(cachePath):
+        return None
+    if cachePath.endswith('.mmap'):
+        return readResultStore(cachePath, columns)
+    try:
+        return readNpzResult(cachePath, columns)
+    except Exception as e:
+        print(f'Failed to read result cache {cachePath}: {e}')
+        return None
+
+
+def readNpzResult(npzPath: str, columns: Union[List, None] = None) -> pd.DataFrame:
+    '''
+    Reads a result DataFrame written by writeNpzResult. Only the given columns (and always the first, i.e. time, column) are loaded if columns is specified.
+    '''
+    with np.load(npzPath, allow_pickle=False) as npz:
+        columnNames = [decodeColumnName(col) for col in json.loads(str(npz[COLUMNS_KEY]))]
+        data = dict()
+        for i, col in enumerate(columnNames):
+            if i == 0 or columns is None or col in columns:
+                data[col] = npz[f'c{i}']                                # Only the accessed members of the .npz file are read
+    return toResultDataFrame(data)
+
+
+def writeNpzResult(npzPath: str, resultData: pd.DataFrame, compressed: bool = False) -> None:
+    '''
+    Writes the result DataFrame to a .npz file with one array per column and the column names stored as JSON.
+    '''
+    arrays = {f'c{i}': np.ascontiguousarray(resultData.iloc[:, i].to_numpy()) for i in range(len(resultData.columns))}
+    arrays[COLUMNS_KEY] = np.array(json.dumps([encodeColumnName(col) for col in resultData.columns]))
+    with open(npzPath, 'wb') as file:
+        if compressed:
+            np.savez_compressed(file, **arrays)
+        else:
+            np.savez(file, **arrays)
+
+
+def readColumnarResult(filePath: str, columns: Union[List, None] = None) -> pd.DataFrame:
+    '''
+    Reads a binary columnar result file (.parquet, .feather or .npz) written by psout_to_csv, i.e. without any text parsing.
+    Only the given columns (and always the first, i.e. time, column) are read if columns is specified.
+    '''
+    fileExt = splitext(filePath)[1].lower()
+    if fileExt == '.parquet':
+        if columns is not None:
+            import pyarrow.parquet as pq
+            columns = selectColumns(pq.ParquetFile(filePath).schema_arrow.names, columns)
+        return pd.read_parquet(filePath, columns=columns)
+    elif fileExt == '.feather':
+        if columns is not None:
+            import pyarrow as pa
+            with pa.memory_map(filePath) as source:
+                columns = selectColumns(pa.ipc.open_file(source).schema.names, columns)
+        return pd.read_feather(filePath, columns=columns)
+    elif fileExt == '.npz':
+        return readNpzResult(filePath, columns)
+    raise ValueError(f'Unknown columnar result file type: {filePath}')
+
+
+def selectColumns(names: List[str], columns: List) -> List[str]:
+    '''
+    Returns the first (time) column and the given columns present in the list of column names of a columnar result file.
+    '''
+    return names[:1] + [name for name in names[1:] if name in columns]
+
+
+def writeColumnarResult(filePath: str, resultData: pd.DataFrame) -> None:
+    '''
+    Writes a binary columnar result file, the format is given by the file extension, i.e. .parquet (zstd), .feather (zstd) or .npz (compressed).
+    The signals are stored in their binary representation, i.e. the round trip is bit-exact.
+    '''
+    fileExt = splitext(filePath)[1].lower()
+    if fileExt == '.parquet':
+        resultData.to_parquet(filePath, compression='zstd', index=False)
+    elif fileExt == '.feather':
+        resultData.to_feather(filePath, compression='zstd')
+    elif fileExt == '.npz':
+        writeNpzResult(filePath, resultData, compressed=True)
+    else:
+        raise ValueError(f'Unknown columnar result file type: {filePath}')
+
+
+def readResultStore(storePath: str, columns: Union[List, None] = None) -> Union[pd.DataFrame, None]:
+    '''
+    Reads the memory-mapped result store. The signals are returned as read-only memory-mapped float32 columns.
+    Only the given columns (and always the time column) are mapped if columns is specified.
+    Returns None if there is no valid store.
+    '''
+    try:
+        index = readResultStoreIndex(storePath)
+        nSamples = index['samples']
+        timeBase = index['time']
+        if 'file' in timeBase:
+            time = np.memmap(join(storePath, timeBase['file']), dtype=np.float64, mode='r', shape=(nSamples,))
+        else:
+            time = timeBase['t0'] + timeBase['dt']*np.arange(nSamples)
+
+        data = {decodeColumnName(index['time']['name']): time}
+        for signal in index['signals']:
+            col = decodeColumnName(signal['name'])
+            if columns is None or col in columns:
+                data[col] = np.memmap(join(storePath, signal['file']), dtype=np.float32, mode='r', shape=(nSamples,))
+    except Exception as e:
+        print(f'Failed to read result store {storePath}: {e}')
+        return None
+
+    return toResultDataFrame(data)
+
+
+def readResultStoreIndex(storePath: str) -> Dict:
+    '''
+    Returns the index of the memory-mapped result store, i.e. the signal names, units and time base.
+    '''
+    with open(join(storePath, STORE_INDEX), 'r') as file:
+        return json.load(file)
+
+
+def toResultDataFrame(data: Dict) -> pd.DataFrame:
+    '''
+    Wraps the column arrays in a DataFrame without copying them.
+    '''
+    resultData = pd.DataFrame(data, copy=False)
+    if any(isinstance(col, tuple) for col in resultData.columns):
+        resultData.columns = pd.MultiIndex.from_tuples(resultData.columns)
+    return resultData
+
+
+def encodeColumnName(col):
+    return list(col) if isinstance(col, tuple) else col
+
+
+def decodeColumnName(col):
+    return tuple(col) if isinstance(col, list) else col
+
+
+def writeResultCache(cachePath: str, resultData: pd.DataFrame, units: Union[Dict, None] = None) -> None:
+    '''
+    Writes the result DataFrame to the cache (npz) or store (mmap) and removes outdated cache entries of the same result file.
+    Failing to write the cache, e.g. due to a read-only result folder, is not an error.
+    '''
+    cacheDir, cacheName = dirname(cachePath), basename(cachePath)
+    resultName = cacheName.rsplit('.', 2)[0]
+    try:
+        makedirs(cacheDir, exist_ok=True)                           # The cache folder may be created concurrently by another worker
+        for oldCache in glob(join(cacheDir, f'{escape(resultName)}.*.*')):
+            if isdir(oldCache):
+                shutil.rmtree(oldCache)
+            else:
+                remove(oldCache)
+
+        if cachePath.endswith('.mmap'):
+            writeResultStore(cachePath, resultData, units)
+            return
+
+        tmpPath = cachePath + '.tmp'
+        writeNpzResult(tmpPath, resultData)
+        replace(tmpPath, cachePath)
+    except Exception as e:
+        print(f'Failed to write result cache {cachePath}: {e}')
+
+
+
+def writeResultStore(storePath: str, resultData: pd.DataFrame, units: Union[Dict, None] = None) -> None:
+    '''
+    Writes the result DataFrame to a memory-mapped store, i.e. one contiguous float32 file per signal and an index with the signal names,
+    units and time base. The time column is stored as a time base (t0, dt) if it is exactly equidistant, otherwise as a float64 file.
+    '''
+    units = units if units is not None else dict()
+    tmpPath = storePath + '.tmp'
+    if exists(tmpPath):
+        shutil.rmtree(tmpPath)
+    makedirs(tmpPath)
+
+    time = np.asarray(resultData.iloc[:, 0], dtype=np.float64)
+    nSamples = len(time)
+    timeBase: Dict = {'name': encodeColumnName(resultData.columns[0])}
+    dt = (time[1] - time[0]) if nSamples > 1 else 0.0
+    if nSamples > 0 and np.array_equal(time[0] + dt*np.arange(nSamples), time):
+        timeBase.update({'t0': float(time[0]), 'dt': float(dt)})
+    else:
+        timeBase['file'] = 'time.f8'
+        time.tofile(join(tmpPath, timeBase['file']))
+
+    signals = list()
+    for i in range(1, len(resultData.columns)):
+        col = resultData.columns[i]
+        signal = {'name': encodeColumnName(col), 'units': units.get(col, ''), 'file': f'c{i}.f32'}
+        np.asarray(pd.to_numeric(resultData.iloc[:, i], errors='coerce'), dtype=np.float32).tofile(join(tmpPath, signal['file']))
+        signals.append(signal)
+
+    with open(join(tmpPath, STORE_INDEX), 'w') as file:
+        json.dump({'samples': nSamples, 'time': timeBase, 'signals': signals}, file, indent=1)
+    replace(tmpPath, storePath)
@@ -12,36 +12,88 @@ def calculate_gradient(time, values):
     return gradient
 
 
-def downSample(x_value, y_value, downsampling_method, gradient_threshold):
+AMOUNT_POINT_BUDGET = 100   # Default number of output points of the AMOUNT (MinMaxLTTB) downsampling
+AUTO_MIN_POINTS = 100       # Minimum number of output points of the automatic point budget
+PLOT_HEIGHT_PX = 500        # Height of the plots in pixels, see plotter.setupPlotLayout
+
+
+def downSample(x_value, y_value, downsampling_method, gradient_threshold, gradient_decimation=20, point_budget=0, pixel_width=1000):
+    if point_budget == 'auto':
+        point_budget = auto_point_budget(x_value, y_value, pixel_width)
     if downsampling_method == DownSamplingMethod.GRADIENT:
-        x_value, y_value = downsample_based_on_gradient(x_value, y_value, gradient_threshold)
+        x_value, y_value = downsample_based_on_gradient(x_value, y_value, gradient_threshold, gradient_decimation, point_budget)
     elif downsampling_method == DownSamplingMethod.AMOUNT:
-        x_value, y_value = down_sample(x_value, y_value)
+        x_value, y_value = down_sample(x_value, y_value, point_budget if point_budget > 0 else AMOUNT_POINT_BUDGET)
     return x_value, y_value
+
+
+def auto_point_budget(time, values, pixel_width):
+    '''
+    Returns the point budget of a signal from the plot width in pixels and the signal variability, i.e. two points (the min and max)
+    for each pixel column in which the signal spans more than one vertical pixel, but at least AUTO_MIN_POINTS.
+    A flat run then gets AUTO_MIN_POINTS and a signal varying over the whole plot gets two points per pixel column.
+    '''
+    time = np.asarray(time)
+    values = np.asarray(values)
+    if values.dtype == object:
+        values = pd.to_numeric(values, errors='coerce')
+    if len(values) <= AUTO_MIN_POINTS:
+        return AUTO_MIN_POINTS
+    valueRange = np.nanmax(values) - np.nanmin(values)
+    if not valueRange > 0:
+        return AUTO_MIN_POINTS
+    starts = np.unique(np.searchsorted(time, np.linspace(time[0], time[-1], pixel_width, endpoint=False)))
+    span = np.fmax.reduceat(values, starts) - np.fmin.reduceat(values, starts)
+    activeColumns = np.count_nonzero(span > valueRange/PLOT_HEIGHT_PX)
+    return int(min(max(2*activeColumns, AUTO_MIN_POINTS), 2*pixel_width))
         
 
-def downsample_based_on_gradient(time, values, gradient_threshold):
-    values = pd.to_numeric(values, errors='coerce')
-    gradient = calculate_gradient(time, values)
-    low_gradient_indices = np.where(np.abs(gradient) < gradient_threshold)[0]
+def downsample_based_on_gradient(time, values, gradient_threshold, decimation=20, point_budget=0):
+    '''
+    Keeps every decimation'th point where the gradient is low and all points where the gradient is high, i.e. the step edges.
+    If point_budget > 0 and more points are kept, the kept points are reduced to the first and last point and the min and max point of
+    (point_budget - 2)/2 equal time buckets, i.e. the output is bounded by point_budget (at least 4) while the step edges and extrema are preserved.
+    Works on the raw ndarrays, i.e. Series are converted without copying and the returned time and values are ndarrays.
+    '''
+    time = np.asarray(time)
+    values = np.asarray(values)
+    if values.dtype == object:
+        values = pd.to_numeric(values, errors='coerce')
+    gradient = np.abs(calculate_gradient(time, values))
+
+    # Select every decimation'th point where the gradient is low and all points where the gradient is high (NaN gradients are dropped)
+    keep = gradient >= gradient_threshold
+    keep[np.flatnonzero(gradient < gradient_threshold)[::max(int(decimation), 1)]] = True
+    indices = np.flatnonzero(keep)
 
-    # Select points where the gradient is low (downsampled points)
-    downsampled_indices = low_gradient_indices[::20]  # Change 10 to control the downsampling rate
+    if 0 < point_budget < len(indices):
+        indices = indices[bucket_min_max(time[indices], values[indices], max((point_budget - 2) // 2, 1))]     # The first and last point are kept besides the buckets
 
-    # Combine low gradient downsampled points with high gradient points
-    high_gradient_indices = np.where(np.abs(gradient) >= gradient_threshold)[0]
-    combined_indices = np.unique(np.concatenate([downsampled_indices, high_gradient_indices]))
+    return time[indices], values[indices]
 
-    downsampled_time = time[combined_indices]
-    downsampled_values = values[combined_indices]
 
-    return downsampled_time, downsampled_values
+def bucket_min_max(time, values, n_buckets):
+    '''
+    Returns the sorted indices of the first, the last and the min and max value points of n_buckets equal time buckets.
+    '''
+    span = time[-1] - time[0]
+    buckets = ((time - time[0])*(n_buckets/span)).astype(np.int64) if span > 0 else np.zeros(len(time), dtype=np.int64)
+    np.clip(buckets, 0, n_buckets - 1, out=buckets)
+    starts = np.flatnonzero(np.diff(buckets, prepend=-1))               # The time is increasing, i.e. the points of each bucket are contiguous
+    counts = np.diff(np.append(starts, len(time)))
+    positions = np.arange(len(time))
+    extrema = [[0, len(time) - 1]]
+    for reduce in (np.fmin, np.fmax):                                   # The first min and max point of each bucket, NaN values are ignored
+        extremum = np.repeat(reduce.reduceat(values, starts), counts)
+        first = np.minimum.reduceat(np.where(values == extremum, positions, len(time)), starts)
+        extrema.append(first[first < len(time)])
+    return np.unique(np.concatenate(extrema))
 
 
-def down_sample(data_x_axis: List[int], data_y_axis: List[int]) -> Tuple[List[int], List[int]]:
-    if len(data_x_axis) < 100:
+def down_sample(data_x_axis: List[int], data_y_axis: List[int], n_out: int = AMOUNT_POINT_BUDGET) -> Tuple[List[int], List[int]]:
+    if len(data_x_axis) < n_out:
         return data_x_axis, data_y_axis
-    downsample = MinMaxLTTBDownsampler().downsample(data_x_axis, data_y_axis, n_out=100)
+    downsample = MinMaxLTTBDownsampler().downsample(data_x_axis, data_y_axis, n_out=n_out)
     return data_x_axis[downsample], data_y_axis[downsample]
 
 
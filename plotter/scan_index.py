@@ -0,0 +1,75 @@
+'''
+Index of the result files in the simulation data folders, used to map the result files without opening them.
+Identifying a .csv or .inf result file requires reading its first lines, which is slow on network shares holding thousands of files.
+With the scan index enabled, the identification of each file is stored in a 'scan_index.json' sidecar in the '.mtb_cache' folder of
+the simulation data folder, keyed on the file name, size and modification time. Unchanged files are then identified from the index,
+i.e. an unchanged folder is mapped from the (cached) directory listing only.
+'''
+from __future__ import annotations
+import json
+from os import makedirs, replace, scandir
+from os.path import exists, join
+from typing import Callable, Dict, List, Tuple
+from Result import ResultType
+from result_cache import CACHE_DIR
+
+SCAN_INDEX = 'scan_index.json'
+
+
+def readScanIndex(dirPath: str) -> Dict[str, List]:
+    '''
+    Reads the scan index of the folder, i.e. file name -> [size, mtime, result type name, rank, project name].
+    '''
+    indexPath = join(dirPath, CACHE_DIR, SCAN_INDEX)
+    if not exists(indexPath):
+        return dict()
+    try:
+        with open(indexPath, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return dict()
+
+
+def writeScanIndex(dirPath: str, index: Dict[str, List]) -> None:
+    '''
+    Writes the scan index of the folder. Failing to write the index, e.g. due to a read-only folder, is not an error.
+    '''
+    cacheDir = join(dirPath, CACHE_DIR)
+    indexPath = join(cacheDir, SCAN_INDEX)
+    try:
+        makedirs(cacheDir, exist_ok=True)                           # The cache folder may be created concurrently by another worker
+        with open(indexPath + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(index, file)
+        replace(indexPath + '.tmp', indexPath)
+    except OSError as e:
+        print(f'Failed to write scan index {indexPath}: {e}')
+
+
+def scanResultFiles(dirPath: str, idFile: Callable, useIndex: bool) -> List[Tuple]:
+    '''
+    Returns the (type, rank, project name, bulk name, full path) of the result files in the folder, as returned by idFile.
+    Files that are not result files are left out. If useIndex is True, unchanged files are identified from the scan index.
+    '''
+    index = readScanIndex(dirPath) if useIndex else dict()
+    newIndex: Dict[str, List] = dict()
+    identified: List[Tuple] = list()
+    with scandir(dirPath) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            fileStat = entry.stat()
+            cached = index.get(entry.name)
+            if cached is not None and cached[0] == fileStat.st_size and cached[1] == fileStat.st_mtime_ns:
+                newIndex[entry.name] = cached
+                if cached[2] is not None:
+                    identified.append((ResultType[cached[2]], cached[3], cached[4], join(dirPath, cached[4]), entry.path))
+                continue
+
+            typ, rank, projectName, bulkName, fullpath = idFile(entry.path)
+            newIndex[entry.name] = [fileStat.st_size, fileStat.st_mtime_ns, typ.name if typ is not None else None, rank, projectName]
+            if typ is not None:
+                identified.append((typ, rank, projectName, bulkName, fullpath))
+
+    if useIndex and newIndex != index:
+        writeScanIndex(dirPath, newIndex)
+    return identified
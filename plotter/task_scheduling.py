@@ -0,0 +1,153 @@
+'''
+Functions to schedule the plot tasks of the plotter.
+The cost of each rank is estimated from its result files, so the most expensive ranks can be submitted first (longest processing time first).
+The workers of the process pool pull the tasks from the shared task queue in submission order, which prevents a few large
+ranks at the end of the run from leaving the other workers idle.
+The peak memory of each rank is estimated as well, to size the number of workers to the available memory and to only start a rank
+when its estimated memory fits next to the ranks already running.
+'''
+from __future__ import annotations
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from os.path import getsize
+from typing import Callable, Dict, Iterator, List, Tuple
+import psutil
+from Result import ResultType, Result
+from Figure import Figure
+from Cursor import Cursor
+from read_configs import ReadConfig
+from result_cache import resultSourceFiles
+
+# Relative processing cost per byte of result file for each result type, i.e. text files are more expensive to parse than binary files
+COST_PER_BYTE = {ResultType.RMS: 3.0,
+                 ResultType.EMT_INF: 3.0,
+                 ResultType.EMT_PSOUT: 1.0,
+                 ResultType.EMT_CSV: 3.0,
+                 ResultType.EMT_ZIP: 5.0,
+                 ResultType.EMT_COLUMNAR: 0.5}
+
+# Relative extra cost of the guides and of each cursor table
+GUIDE_COST_FACTOR = 0.5
+CURSOR_COST_FACTOR = 0.02
+
+# Estimated bytes of memory per byte of result file for each result type when loaded as a DataFrame (including the parser overhead)
+MEMORY_PER_BYTE = {ResultType.RMS: 2.0,
+                   ResultType.EMT_INF: 2.0,
+                   ResultType.EMT_PSOUT: 1.5,
+                   ResultType.EMT_CSV: 2.0,
+                   ResultType.EMT_ZIP: 8.0,
+                   ResultType.EMT_COLUMNAR: 3.0}
+
+WORKER_BASE_MEMORY = 300e6  # Estimated memory of an idle worker process in bytes, i.e. Python, Pandas, Plotly, etc.
+GUIDE_MEMORY_FACTOR = 0.5   # Relative extra memory of the guide signals
+MEMORY_FRACTION = 0.8       # Fraction of the available memory the plot tasks may use
+
+
+def resultFileSize(result: Result) -> int:
+    '''
+    Returns the total size in bytes of the files the result is read from.
+    '''
+    size = 0
+    for file in resultSourceFiles(result):
+        try:
+            size += getsize(file)
+        except OSError:
+            pass
+    return size
+
+
+def estimateRankCost(resultList: List[Result], figureList: List[Figure], ranksCursor: List[Cursor], config: ReadConfig) -> float:
+    '''
+    Estimates the relative cost of plotting a rank. The cost scales with the size of the result files (i.e. the number of samples),
+    weighted by the result type, the number of figures and the output types, plus the extra cost of the guides and cursors.
+    '''
+    outputs = int(config.genHTML) + int(config.genImage)
+    cost = 0.0
+    for result in resultList:
+        resultCost = resultFileSize(result)*COST_PER_BYTE.get(result.typ, 1.0)
+        processing = 1.0 + 0.1*len(figureList)*max(outputs, 1) + CURSOR_COST_FACTOR*len(ranksCursor)
+        if config.genGuide and result.typ != ResultType.RMS:
+            processing += GUIDE_COST_FACTOR
+        cost += resultCost*processing
+    return cost
+
+
+def orderTasksByCost(tasks: List, costs: Dict[int, float]) -> List:
+    '''
+    Orders the (rank, ...) tasks by decreasing estimated cost, i.e. the longest tasks are submitted first.
+    '''
+    return sorted(tasks, key=lambda task: costs.get(task[0], 0.0), reverse=True)
+
+
+def parallelEfficiency(taskTimes: List[float], makespan: float, workers: int) -> str:
+    '''
+    Returns a summary of the makespan (wall time) versus the sum of the task times, i.e. the parallel efficiency achieved.
+    '''
+    sumTaskTime = sum(taskTimes)
+    efficiency = sumTaskTime/(makespan*workers) if makespan > 0 and workers > 0 else 0.0
+    return (f'Makespan {makespan:.1f} s, sum of task times {sumTaskTime:.1f} s over {workers} worker(s), '
+            f'speed-up {sumTaskTime/makespan if makespan > 0 else 0.0:.2f}, parallel efficiency {efficiency*100:.0f} %')
+
+
+def estimateRankMemory(resultList: List[Result], config: ReadConfig) -> float:
+    '''
+    Estimates the peak memory in bytes of plotting a rank. The results of a rank are processed one at a time, so the peak is set
+    by the largest result, plus the base memory of the worker process.
+    '''
+    peak = 0.0
+    for result in resultList:
+        memory = resultFileSize(result)*MEMORY_PER_BYTE.get(result.typ, 2.0)
+        if config.psoutDtype == 'float32' and result.typ == ResultType.EMT_PSOUT:
+            memory *= 0.5
+        if config.genGuide and result.typ != ResultType.RMS:
+            memory *= 1.0 + GUIDE_MEMORY_FACTOR
+        peak = max(peak, memory)
+    return WORKER_BASE_MEMORY + peak
+
+
+def memoryBudget() -> float:
+    '''
+    Returns the memory in bytes available for the plot tasks.
+    '''
+    return psutil.virtual_memory().available*MEMORY_FRACTION
+
+
+def resolveWorkers(processes: int, memory: Dict[int, float], budget: float) -> int:
+    '''
+    Returns the number of worker processes to use. If processes is 0, the number of CPU cores is used,
+    capped by the memory budget divided by the largest estimated rank peak memory.
+    '''
+    if processes > 0:
+        return processes
+    workers = os.cpu_count() or 1
+    if memory:
+        workers = min(workers, int(budget // max(memory.values())))
+    return max(workers, 1)
+
+
+def scheduleTasks(executor, fn: Callable, tasks: List, memory: Dict[int, float], budget: float, workers: int) -> Iterator[Tuple]:
+    '''
+    Submits the (rank, ...) tasks to the executor in the given order, while at most workers tasks are running and the sum of the
+    estimated memory of the running tasks fits in the memory budget. A task that does not fit is skipped until enough memory is
+    released, while the next tasks that do fit are started. A task is always started if no other task is running.
+    Yields the (task, future) tuples as the tasks complete.
+    '''
+    pending = list(tasks)
+    running: Dict = dict()
+    inFlightMemory = 0.0
+    while pending or running:
+        i = 0
+        while i < len(pending) and len(running) < workers:
+            taskMemory = memory.get(pending[i][0], 0.0)
+            if running and inFlightMemory + taskMemory > budget:
+                i += 1
+                continue
+            task = pending.pop(i)
+            running[executor.submit(fn, *task)] = task
+            inFlightMemory += taskMemory
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            task = running.pop(future)
+            inFlightMemory -= memory.get(task[0], 0.0)
+            yield task, future
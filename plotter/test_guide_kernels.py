@@ -0,0 +1,192 @@
+'''
+Checks that the guide kernels give bit-identical results to the pure-Python kernels (.py_func when compiled with Numba)
+and to the original sample-by-sample loops of guidePramp2 and guideLFSMRamp they replaced, including the original scalar guideLFSM and guideFSM.
+Run with: python -m pytest test_guide_kernels.py
+'''
+import numpy as np
+import pytest
+from guide_kernels import lfsmRampKernel, pramp2Kernel
+
+TS = 1e-3           # Sampling time [s]
+SAMPLES = 20000
+PTHRESH = 0.0001
+FLOWER = 0.020
+FUPPER = 0.040
+FN = 50.0
+
+
+def pythonKernel(kernel):
+    return getattr(kernel, 'py_func', kernel)
+
+
+def referencePramp2(Pref, Pavail, P, m, Ts):
+    '''
+    The loop of guidePramp2 before it was moved to pramp2Kernel.
+    '''
+    Pref_array, Pavail_array, P_array = Pref, Pavail, P
+    for k in range(1, len(P)):
+        if np.abs(Pref_array[k] - P_array[k-1]) > PTHRESH:
+            if Pref_array[k] - P_array[k-1] > 0:  # If P needs to increasing
+                P_array[k] = m*Ts + P_array[k-1]
+                if P_array[k] > Pref_array[k]:  # Ensure P does not exceed Pref / Pavail
+                    P_array[k] = Pref_array[k]
+            else: # If P needs to decreasing
+                P_array[k] = -m*Ts + P_array[k-1]
+                if P_array[k] < Pref_array[k]:  # Ensure P does not go below Pref
+                    P_array[k] = Pref_array[k]
+                if P_array[k] > Pavail_array[k]:  # Ensure P is clamped to Pavail if Pavail goes down suddenly
+                    P_array[k] = Pavail_array[k]
+        else: # Maintain current value of P
+            P_array[k] = P_array[k-1]
+
+
+def referenceFSM(Pref, f, DK=1, s=10, db=0):
+    '''
+    The scalar guideFSM before it was vectorized.
+    '''
+    Pn = 1.0 #pu
+    fn = 50  #Hz
+    if DK == 1:
+        fRU = 49.8
+        fRO = 50.2
+    elif DK == 2:
+        fRU = 49.5
+        fRO = 50.5
+    else:
+        print('"DK" can either be "1" or "2"!')
+        return 0
+
+    f = fRU if f < fRU else f
+    f = fRO if f > fRO else f
+    
+    if f<fn:
+        Pnew = Pref-100/s*(f-fn+db)/fn*Pn if f<fn-db else Pref
+    else:
+        Pnew = Pref-100/s*(f-fn-db)/fn*Pn if f>fn+db else Pref        
+    
+    # Clamp Pnew to to be not exceed Pref by +/- 10%
+    if Pnew > Pref+0.1*Pn: Pnew = Pref+0.1*Pn
+    if Pnew < Pref-0.1*Pn: Pnew = Pref-0.1*Pn
+    
+    return Pnew
+
+
+def referenceLFSM(Pref, f, Pavail=1.0, DK=1, FSM=False, s_fsm=10, db=0):
+    '''
+    The scalar guideLFSM before it was vectorized.
+    '''
+    Pn = 1.0 #pu
+    fn = 50  #Hz
+    if DK == 1:
+        f1 = 50.2 if f > fn else 49.8
+        s = 5
+    elif DK == 2:
+        f1 = 50.5 if f > fn else 49.5
+        s = 4
+    else:
+        print('"DK" can either be "1" or "2"!')
+        return 0
+    
+    if FSM:
+        Pref = referenceFSM(Pref, f, DK, s_fsm, db)
+        
+    if f > fn and f > f1 or f < fn and f < f1:
+        Pnew = Pref-100/s*(f-f1)/fn*Pn
+    else:
+        Pnew = Pref
+        
+    if Pnew >= Pavail:
+        Pnew = Pavail  # Limit Active Power to Pavail
+    elif Pnew <= 0.0:
+        Pnew = 0.0  # Limit Active Power to 0.0 pu
+
+    return Pnew
+
+
+def referenceLFSMRamp(Pref_array, Pavail_array, P_array, f_array, fTdLpf_array, m, Ts, DK, FSM, s_fsm, db):
+    '''
+    The loop of guideLFSMRamp before it was moved to lfsmRampKernel.
+    '''
+    LOWER = True
+    UPPER = False
+    Pref = Pref_array[0]
+    for k in range(1, len(P_array)):
+        if np.abs(f_array[k] - FN) > FUPPER:
+            UPPER = True
+            LOWER = False
+        elif np.abs(f_array[k] - FN) < FLOWER:
+            LOWER = True
+            UPPER = False
+        if LOWER:    # Ramping active
+            if np.abs(Pref_array[k] - P_array[k-1]) > PTHRESH:
+                if Pref_array[k] - P_array[k-1] > 0:  # If P needs to increasing
+                    P_array[k] = m*Ts + P_array[k-1]
+                    if P_array[k] > Pref_array[k]:  # Ensure P does not exceed Pref
+                        P_array[k] = Pref_array[k]
+                else: # If P needs to decreasing
+                    P_array[k] = -m*Ts + P_array[k-1]
+                    if P_array[k] < Pref_array[k]:  # Ensure P does not go below Pref
+                        P_array[k] = Pref_array[k]
+            else:   # Maintain current value of P
+                P_array[k] = P_array[k-1]
+            Pref = P_array[k] # The new reference is the current P value
+        elif UPPER:   # LFSM active
+            P_array[k] = referenceLFSM(Pref=Pref, f=fTdLpf_array[k-1], Pavail=Pavail_array[k], DK=DK, FSM=FSM, s_fsm=s_fsm, db=db)
+
+
+def rampInputs():
+    '''
+    Active power reference steps up and down, and an available power drop below the output.
+    '''
+    t = np.arange(SAMPLES)*TS
+    Pref = np.where(t < 2.0, 0.2, np.where(t < 10.0, 0.9, 0.4))
+    Pavail = np.where((t > 12.0) & (t < 16.0), 0.3, 1.0)
+    Pref = np.minimum(Pref, Pavail)
+    P = np.full(SAMPLES, 0.2)
+    return Pref, Pavail, P
+
+
+def frequencyInputs():
+    '''
+    Over- and underfrequency excursions beyond the upper hysteresis threshold, with a slow return through the hysteresis band.
+    '''
+    t = np.arange(SAMPLES)*TS
+    f = FN + 0.8*np.sin(2*np.pi*t/8.0)*(t > 1.0) - 0.6*(t > 14.0)*(t < 17.0)
+    fTdLpf = np.concatenate([np.full(50, FN), f[:-50]])     # Delayed frequency
+    return f, fTdLpf
+
+
+@pytest.mark.parametrize('Pn', [100.0, 500.0])
+def test_pramp2Kernel(Pn):
+    m = min(0.2, 60/Pn)/60
+    Pref, Pavail, P = rampInputs()
+    expected = P.copy()
+    referencePramp2(Pref, Pavail, expected, m, TS)
+
+    compiled = P.copy()
+    pramp2Kernel(Pref, Pavail, compiled, m*TS, PTHRESH)
+    python = P.copy()
+    pythonKernel(pramp2Kernel)(Pref, Pavail, python, m*TS, PTHRESH)
+
+    assert np.array_equal(compiled, python)
+    assert np.array_equal(compiled, expected)
+
+
+@pytest.mark.parametrize('Pn', [100.0, 500.0])
+@pytest.mark.parametrize('DK', [1, 2, 3])     # DK 3 is invalid, i.e. P is 0 while LFSM is active
+@pytest.mark.parametrize('FSM', [False, True])
+def test_lfsmRampKernel(Pn, DK, FSM):
+    m = min(0.2, 60/Pn)/60
+    s_fsm, db = 8.0, 0.01
+    Pref, Pavail, P = rampInputs()
+    f, fTdLpf = frequencyInputs()
+    expected = P.copy()
+    referenceLFSMRamp(Pref, Pavail, expected, f, fTdLpf, m, TS, DK, FSM, s_fsm, db)
+
+    compiled = P.copy()
+    lfsmRampKernel(Pref, Pavail, compiled, f, fTdLpf, m*TS, PTHRESH, FLOWER, FUPPER, FN, DK, FSM, s_fsm, db)
+    python = P.copy()
+    pythonKernel(lfsmRampKernel)(Pref, Pavail, python, f, fTdLpf, m*TS, PTHRESH, FLOWER, FUPPER, FN, DK, FSM, s_fsm, db)
+
+    assert np.array_equal(compiled, python)
+    assert np.array_equal(compiled, expected)
@@ -0,0 +1,200 @@
+'''
+Multi-resolution (min/max pyramid) storage of the plotted signals for interactive zooming in the html reports.
+The html pages embed one downsampled trace per signal. With the zoom pyramid enabled, the full resolution signal is also stored as a
+set of levels next to the html page, where each level keeps the min and max sample of buckets twice as long as the previous level.
+The levels are split in chunks, each written as a small .js file holding the base64 encoded samples, as browsers do not allow fetching
+local files from pages opened over file://, but do allow loading scripts. The pyramid manifest is stored in the 'meta' attribute of
+the Plotly trace, and the mtb_pyramid.js hook loads the finest level that fits the plot width for the visible time window when zooming.
+'''
+from __future__ import annotations
+import base64
+import shutil
+from os import makedirs
+from os.path import basename, exists, join
+from typing import Dict, List
+import numpy as np
+
+PYRAMID_JS = 'mtb_pyramid.js'
+CHUNK_POINTS = 65536        # Number of samples per chunk file
+COARSEST_POINTS = 4096      # Number of samples of the coarsest level, i.e. about the number of samples of the embedded trace
+
+
+def getPyramidDir(resultsDir: str, rank: int) -> str:
+    '''
+    Returns the (emptied) folder holding the pyramid chunks of the given rank.
+    '''
+    pyramidDir = join(resultsDir, f'{rank}_pyramid')
+    if exists(pyramidDir):
+        shutil.rmtree(pyramidDir)
+    makedirs(pyramidDir)
+    return pyramidDir
+
+
+def pyramidLevels(values: np.ndarray, maxPoints: int) -> List[np.ndarray]:
+    '''
+    Returns the sorted sample indices of each level of the min/max pyramid, finest level first.
+    The finest level is the raw signal if it has at most maxPoints samples, otherwise the first min/max level with at most maxPoints samples.
+    '''
+    n = len(values)
+    levels: List[np.ndarray] = list()
+    if n <= maxPoints:
+        levels.append(np.arange(n))
+    if n <= COARSEST_POINTS:
+        return levels
+
+    # Min and max sample of buckets of two samples, the last bucket holds a single sample if n is odd
+    first = np.arange(0, n, 2)
+    second = np.minimum(first + 1, n - 1)
+    minIdx = np.where(values[first] <= values[second], first, second)
+    maxIdx = np.where(values[first] > values[second], first, second)
+    while True:
+        points = 2*len(minIdx)
+        if points <= maxPoints and (len(levels) == 0 or points < len(levels[-1])):
+            levels.append(np.sort(np.stack([minIdx, maxIdx], axis=1), axis=1).ravel())
+        if points <= COARSEST_POINTS:
+            return levels
+
+        # Merge each pair of adjacent buckets, i.e. double the bucket length
+        first = np.arange(0, len(minIdx), 2)
+        second = np.minimum(first + 1, len(minIdx) - 1)
+        minIdx = np.where(values[minIdx[first]] <= values[minIdx[second]], minIdx[first], minIdx[second])
+        maxIdx = np.where(values[maxIdx[first]] > values[maxIdx[second]], maxIdx[first], maxIdx[second])
+
+
+def writePyramid(pyramidDir: str, key: str, time, values, maxPoints: int) -> Dict:
+    '''
+    Writes the min/max pyramid chunks of the signal and returns the manifest of the pyramid, i.e. the time base and for each level
+    the number of samples and the [start time, end time, file] of each chunk.
+    The samples are stored as float32 values and, if the time is equidistant, as uint32 sample indices, otherwise as float64 times.
+    '''
+    time = np.asarray(time, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float32)
+    manifest: Dict = {'dir': basename(pyramidDir), 'levels': list()}
+    if len(time) < 2:
+        return manifest
+
+    dt = (time[-1] - time[0])/(len(time) - 1)
+    equidistant = dt > 0 and np.allclose(time, time[0] + dt*np.arange(len(time)), rtol=0.0, atol=dt*1e-3)     # Within 0.1 % of a time step
+    if equidistant:
+        manifest.update({'t0': float(time[0]), 'dt': float(dt)})
+
+    for level, indices in enumerate(pyramidLevels(values, maxPoints)):
+        chunks = list()
+        for chunk, start in enumerate(range(0, len(indices), CHUNK_POINTS)):
+            part = indices[start:start + CHUNK_POINTS]
+            fileName = f'{key}_{level}_{chunk}.js'
+            x = part.astype('<u4') if equidistant else time[part].astype('<f8')
+            with open(join(pyramidDir, fileName), 'w') as file:
+                file.write(f'mtbPyramid.chunk("{fileName}","{encode(x)}","{encode(values[part])}");\n')
+            chunks.append([float(time[part[0]]), float(time[part[-1]]), fileName])
+        manifest['levels'].append({'points': len(indices), 'chunks': chunks})
+    return manifest
+
+
+def encode(data: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(data, dtype=data.dtype.newbyteorder('<')).tobytes()).decode('ascii')
+
+
+def create_pyramid_js(resultsDir: str) -> None:
+    '''
+    Creates the mtb_pyramid.js hook, which loads the pyramid level that fits the visible time window on Plotly relayout (zoom) events.
+    '''
+    js_content = r'''// Loads the min/max pyramid levels of the plotted signals when zooming, see trace_pyramid.py
+var mtbPyramid = (function () {
+  var chunks = {}, waiting = {};
+
+  function decode(b64, Type) {
+    var s = atob(b64), bytes = new Uint8Array(s.length);
+    for (var i = 0; i < s.length; i++) bytes[i] = s.charCodeAt(i);
+    return new Type(bytes.buffer);
+  }
+
+  function chunk(file, x, y) {
+    chunks[file] = {x: x, y: y, decoded: false};
+    (waiting[file] || []).forEach(function (callback) { callback(); });
+    delete waiting[file];
+  }
+
+  function load(dir, file, callback) {
+    if (file in chunks) { callback(); return; }
+    if (file in waiting) { waiting[file].push(callback); return; }
+    waiting[file] = [callback];
+    var script = document.createElement('script');
+    script.src = dir + '/' + file;
+    document.head.appendChild(script);
+  }
+
+  function samples(pyramid, file) {
+    var data = chunks[file];
+    if (!data.decoded) {
+      data.y = decode(data.y, Float32Array);
+      if (pyramid.dt !== undefined) {
+        var idx = decode(data.x, Uint32Array);
+        data.x = new Float64Array(idx.length);
+        for (var i = 0; i < idx.length; i++) data.x[i] = pyramid.t0 + pyramid.dt*idx[i];
+      } else {
+        data.x = decode(data.x, Float64Array);
+      }
+      data.decoded = true;
+    }
+    return data;
+  }
+
+  function update(gd, trace, x0, x1) {
+    var pyramid = trace.pyramid, levels = pyramid.levels, target = 2*gd.clientWidth;
+    var first = levels[0].chunks[0][0], last = levels[0].chunks[levels[0].chunks.length - 1][1];
+    var level = levels[levels.length - 1];
+    for (var l = 0; l < levels.length; l++) {
+      if (levels[l].points*(x1 - x0)/(last - first) <= target) { level = levels[l]; break; }
+    }
+    var parts = level.chunks.filter(function (c) { return c[1] >= x0 && c[0] <= x1; });
+    if (!parts.length) return;
+    var request = ++trace.request, remaining = parts.length;
+    parts.forEach(function (c) {
+      load(pyramid.dir, c[2], function () {
+        if (--remaining > 0 || request !== trace.request) return;
+        var xs = [], ys = [];
+        parts.forEach(function (c) {
+          var data = samples(pyramid, c[2]);
+          for (var i = 0; i < data.x.length; i++) {
+            if (data.x[i] < x0 && i + 1 < data.x.length && data.x[i + 1] < x0) continue;   // Keep one sample on each side of the window
+            if (data.x[i] > x1 && i > 0 && data.x[i - 1] > x1) break;
+            xs.push(data.x[i]); ys.push(data.y[i]);
+          }
+        });
+        Plotly.restyle(gd, {x: [xs], y: [ys]}, [trace.index]);
+      });
+    });
+  }
+
+  function attach(gd) {
+    var traces = [];
+    (gd.data || []).forEach(function (t, i) {
+      if (t.meta && t.meta.pyramid && t.meta.pyramid.levels.length) {
+        traces.push({index: i, pyramid: t.meta.pyramid, axis: 'xaxis' + (t.xaxis || 'x').slice(1), x: t.x, y: t.y, request: 0});
+      }
+    });
+    if (!traces.length) return;
+    gd.on('plotly_relayout', function (event) {
+      traces.forEach(function (trace) {
+        var a = trace.axis;
+        if (event[a + '.autorange']) {
+          trace.request++;
+          Plotly.restyle(gd, {x: [trace.x], y: [trace.y]}, [trace.index]);
+        } else if (event[a + '.range'] || (a + '.range[0]') in event) {
+          var range = event[a + '.range'] || [event[a + '.range[0]'], event[a + '.range[1]']];
+          update(gd, trace, +range[0], +range[1]);
+        }
+      });
+    });
+  }
+
+  window.addEventListener('load', function () {
+    document.querySelectorAll('.plotly-graph-div').forEach(attach);
+  });
+
+  return {chunk: chunk};
+})();
+'''
+    with open(join(resultsDir, PYRAMID_JS), 'w') as file:
+        file.write(js_content)
@@ -0,0 +1,90 @@
+'''
+Watch mode of the plotter, which plots the ranks while the simulations are still running.
+The watched folder (e.g. the PSCAD build folder of a volley run) is polled for result files. A file is complete when its size and
+modification time are unchanged for WATCH_STABLE_POLLS polls and, if the folder is writable, it can be opened for writing, i.e. the
+simulation closed it. In a read-only folder (e.g. an archived build folder) only the size and modification time are checked.
+In the PSCAD build folder the result files are numbered by the task ID instead of the rank, which is mapped to the rank with the
+caseRankTaskID.csv written by execute_pscad.py.
+'''
+from __future__ import annotations
+from os import W_OK, access, scandir
+from os.path import abspath
+from typing import Callable, Dict, List, Set, Tuple, Union
+import pandas as pd
+from Result import Result
+
+WATCH_INTERVAL = 5.0        # Seconds between polls of the watched folder
+WATCH_STABLE_POLLS = 2      # Number of polls a file must be unchanged to be complete
+SHARING_ERRORS = (32, 33)   # Windows ERROR_SHARING_VIOLATION and ERROR_LOCK_VIOLATION, i.e. the file is still open in the simulation
+
+
+def readTaskIdRanks(csvPath: str) -> Dict[int, int]:
+    '''
+    Reads the task ID to rank mapping of a PSCAD volley run from the caseRankTaskID.csv written by execute_pscad.py.
+    '''
+    df = pd.read_csv(csvPath)
+    return dict(zip(df['Task ID'].astype(int), df['Case Rank'].astype(int)))
+
+
+def isFileClosed(filePath: str) -> bool:
+    '''
+    Returns whether the file can be opened for writing. On Windows this fails while the simulation still holds the file open.
+    Files that the user cannot write to are considered closed, as the check is not possible, i.e. only their size and modification time are checked.
+    '''
+    if not access(filePath, W_OK):
+        return True
+    try:
+        with open(filePath, 'ab'):
+            return True
+    except OSError as e:
+        return getattr(e, 'winerror', None) not in SHARING_ERRORS                                                                   # Other errors, e.g. a read-only share, do not tell whether the file is open
+
+
+class ResultWatcher:
+    '''
+    Polls a folder for complete result files, which are identified with idFile and returned once as Result objects.
+    '''
+    def __init__(self, watchDir: str, group: str, idFile: Callable, taskIdRanks: Union[Dict[int, int], None] = None) -> None:
+        self.watchDir = abspath(watchDir)
+        self.group = group
+        self.idFile = idFile
+        self.taskIdRanks = taskIdRanks
+        self.fileStats: Dict[str, Tuple[int, int]] = dict()
+        self.stablePolls: Dict[str, int] = dict()
+        self.done: Set[str] = set()
+
+    def poll(self) -> List[Result]:
+        '''
+        Returns the result files that completed since the previous poll.
+        '''
+        completed: List[Result] = list()
+        with scandir(self.watchDir) as entries:
+            for entry in entries:
+                if entry.path in self.done or not entry.is_file():
+                    continue
+                fileStat = entry.stat()
+                current = (fileStat.st_size, fileStat.st_mtime_ns)
+                if self.fileStats.get(entry.path) != current or fileStat.st_size == 0:
+                    self.fileStats[entry.path] = current
+                    self.stablePolls[entry.path] = 0
+                    continue
+                self.stablePolls[entry.path] += 1
+                if self.stablePolls[entry.path] < WATCH_STABLE_POLLS or not isFileClosed(entry.path):
+                    continue
+
+                self.done.add(entry.path)
+                result = self.identify(entry.path)
+                if result is not None:
+                    completed.append(result)
+        return completed
+
+    def identify(self, filePath: str) -> Union[Result, None]:
+        typ, rank, projectName, bulkName, fullpath = self.idFile(filePath)
+        if typ is None:
+            return None
+        if self.taskIdRanks is not None:
+            if rank not in self.taskIdRanks:
+                print(f'Task ID {rank} of {filePath} not found in the task ID mapping. Ignoring file.')
+                return None
+            rank = self.taskIdRanks[rank]
+        return Result(typ, rank, projectName, bulkName, fullpath, self.group)